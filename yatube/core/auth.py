@@ -0,0 +1,44 @@
+from django.contrib import auth
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.core.cache import cache
+
+from .identity import remember
+
+AUTH_USER_CACHE_KEY = 'auth_user:{}'
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+
+def get_cached_user(request):
+    """Пользователь сессии из общего кеша.
+
+    Вместе с пользователем хранится хэш сессии, под которым он был
+    проверен; при несовпадении пользователь загружается и проверяется
+    заново штатным ``auth.get_user``.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return auth.get_user(request)
+    key = AUTH_USER_CACHE_KEY.format(user_id)
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == session_hash:
+        remember(cached[1])
+        return cached[1]
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, (session_hash, user), AUTH_USER_CACHE_TIMEOUT)
+        remember(user)
+    return user
+
+
+def is_login_stamp(update_fields):
+    """Сохранение только времени входа (``update_last_login``).
+
+    Такое сохранение не меняет ничего из того, что лежит в кешах,
+    а случается при каждом входе, поэтому сбросы его пропускают.
+    """
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(AUTH_USER_CACHE_KEY.format(user_id))
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+ANONYMOUS_PAGE_TIMEOUT = 60
+ANONYMOUS_PAGE_VERSION_KEY = 'anonymous_page_version'
+
+
+def _page_key(request):
+    version = cache.get_or_set(ANONYMOUS_PAGE_VERSION_KEY, 1, None)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'anonymous_page:{version}:{path}'
+
+
+def invalidate_anonymous_pages():
+    """Сбрасывает все закэшированные страницы для гостей разом."""
+    try:
+        cache.incr(ANONYMOUS_PAGE_VERSION_KEY)
+    except ValueError:
+        cache.set(ANONYMOUS_PAGE_VERSION_KEY, 1, None)
+
+
+def cache_anonymous_page(view):
+    """Кэширует страницу целиком для неавторизованных посетителей.
+
+    Ключ строится по адресу вместе со строкой запроса. Гостям не
+    показываются личные элементы (меню пользователя, форма комментария),
+    поэтому одна копия страницы годится для всех гостей, а пользователи
+    всегда получают страницу, собранную для них.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+        key = _page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = view(request, *args, **kwargs)
+        if (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+        ):
+            cache.set(
+                key, (response.content, response['Content-Type']),
+                ANONYMOUS_PAGE_TIMEOUT
+            )
+        return response
+    return wrapper
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+from django.db.models.query import ModelIterable
+
+from .twolevel import TwoLevelCache
+
+ENTITY_CACHE_TIMEOUT = 60 * 10
+
+_identity_map = ContextVar('identity_map', default=None)
+entity_cache = TwoLevelCache('entities', maxsize=4096, ttl=60)
+
+
+@contextmanager
+def identity_scope():
+    """Карта объектов на время запроса: один экземпляр на строку базы."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def _entity_key(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def remember(*objects):
+    """Кладёт уже загруженные объекты в карту текущего запроса."""
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return
+    for obj in objects:
+        model = obj._meta.concrete_model
+        identity_map.setdefault(_entity_key(model, obj.pk), obj)
+
+
+def resolve(model, ids):
+    """Объекты по первичным ключам: из карты запроса, кеша или базы."""
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        identity_map = {}
+    keys = {_entity_key(model, pk): pk for pk in ids}
+    missing = [key for key in keys if key not in identity_map]
+    if missing:
+        identity_map.update(entity_cache.get_many(missing))
+    missing = [keys[key] for key in keys if key not in identity_map]
+    if missing:
+        loaded = {
+            _entity_key(model, pk): obj
+            for pk, obj in model._default_manager.in_bulk(missing).items()
+        }
+        entity_cache.set_many(loaded, ENTITY_CACHE_TIMEOUT)
+        identity_map.update(loaded)
+    return {
+        pk: identity_map[key] for key, pk in keys.items()
+        if key in identity_map
+    }
+
+
+def attach(objects, *fields):
+    """Подставляет связанные объекты без JOIN и без повторных копий."""
+    if not objects:
+        return
+    meta = objects[0]._meta
+    for name in fields:
+        field = meta.get_field(name)
+        ids = {getattr(obj, field.attname) for obj in objects}
+        ids.discard(None)
+        related = resolve(field.related_model, ids)
+        for obj in objects:
+            field.set_cached_value(
+                obj, related.get(getattr(obj, field.attname))
+            )
+
+
+def forget(obj):
+    """Сбрасывает объект из общего кеша после изменения."""
+    entity_cache.delete(_entity_key(obj._meta.concrete_model, obj.pk))
+
+
+class IdentityMapQuerySet(models.QuerySet):
+    """QuerySet, связи которого подставляются через карту объектов."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._identity_fields = ()
+
+    def with_identity(self, *fields):
+        clone = self._chain()
+        clone._identity_fields = clone._identity_fields + fields
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._identity_fields = self._identity_fields
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if (
+            fetched and self._identity_fields
+            and issubclass(self._iterable_class, ModelIterable)
+        ):
+            attach(self._result_cache, *self._identity_fields)
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+User = get_user_model()
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость запросов с разными хранилищами сессий.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/')
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Временный пользователь исчезает вместе с откатом транзакции.
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-sessions')
+            for engine in ENGINES:
+                with override_settings(SESSION_ENGINE=engine):
+                    self.measure(engine, user, options)
+            transaction.set_rollback(True)
+
+    def measure(self, engine, user, options):
+        # Адрес не из INTERNAL_IPS, чтобы не мерить отладочную панель.
+        client = Client(REMOTE_ADDR='10.0.0.1')
+        client.force_login(user)
+        client.get(options['url'])
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                client.get(options['url'])
+            elapsed = time.perf_counter() - started
+        session_queries = sum(
+            'django_session' in query['sql'] for query in queries
+        )
+        self.stdout.write(
+            f'{engine.rsplit(".", 1)[-1]}: '
+            f'{options["requests"] / elapsed:.0f} запросов/с, '
+            f'к сессиям {session_queries / options["requests"]:.2f} '
+            f'SQL на запрос'
+        )
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.sessions import schedule_session_purge
+from core.tasks import claim, execute
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи фоновой очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Сколько задач выполнять одновременно.'
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Выполнять задачи в процессах, а не в потоках.'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, как только готовые задачи закончатся.'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        # Периодические задачи сами планируют свой следующий запуск.
+        schedule_session_purge()
+        if options['processes']:
+            # Дочерние процессы не должны делить соединение с родителем.
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='tasks'
+            )
+        total = 0
+        with executor:
+            try:
+                while True:
+                    claimed = claim(workers)
+                    if claimed:
+                        total += sum(
+                            1 for _ in executor.map(execute, claimed)
+                        )
+                    elif options['once']:
+                        break
+                    else:
+                        time.sleep(options['poll'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(f'Выполнено задач: {total}')
@@ -0,0 +1,331 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date, quote_etag
+from django.views.static import was_modified_since
+
+from .auth import get_cached_user
+from .identity import identity_scope
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+DEFAULT_MAX_AGE = 60
+# Имена вида app.3f2a1b9c0d4e.css (ManifestStaticFilesStorage)
+# и posts/ab/<62 символа хэша>.jpg (ContentAddressedStorage) неизменяемы.
+HASHED_NAME_RE = re.compile(
+    r'(\.[0-9a-f]{12}\.[^/.]+$)|(/[0-9a-f]{2}/[0-9a-f]{62}\.[^/.]+$)'
+)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK_SIZE = 64 * 1024
+MIN_COMPRESS_LENGTH = 200
+COMPRESSED_CACHE_TIMEOUT = 60 * 10
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml',
+)
+# Содержимое этих тегов выводится как есть и не сжимается.
+PRESERVED_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I
+)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+class StaticFilesMiddleware:
+    """Отдаёт статику и медиафайлы до запуска остальной обработки запроса.
+
+    Для статики выбирается заранее сжатая копия ``.br`` или ``.gz``,
+    если клиент её принимает. Файлы с хэшем в имени кэшируются навсегда.
+    Поддерживаются условные запросы и диапазоны (``Range``). Медиафайлы
+    можно передать веб-серверу заголовком из ``SENDFILE_HEADER``
+    (``X-Accel-Redirect`` для nginx или ``X-Sendfile``), иначе они
+    отдаются через ``wsgi.file_wrapper``, то есть ``sendfile``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.roots = [
+            (settings.STATIC_URL, settings.STATIC_ROOT, True),
+            (settings.MEDIA_URL, settings.MEDIA_ROOT, False),
+        ]
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            for url, root, is_static in self.roots:
+                if url and root and request.path.startswith(url):
+                    response = self.serve(
+                        request, root, request.path[len(url):], is_static
+                    )
+                    if response is not None:
+                        return response
+        return self.get_response(request)
+
+    def serve(self, request, root, name, is_static):
+        path, stat_result = self.find_file(root, name)
+        if path is None:
+            return None
+        etag = quote_etag(
+            f'{int(stat_result.st_mtime):x}-{stat_result.st_size:x}'
+        )
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(stat_result.st_mtime),
+            'Cache-Control': self.cache_control(name),
+            'Accept-Ranges': 'bytes',
+        }
+        if self.not_modified(request, etag, stat_result):
+            return self.with_headers(HttpResponseNotModified(), headers)
+
+        content_type = mimetypes.guess_type(path)[0]
+        content_type = content_type or 'application/octet-stream'
+        response = None
+        if 'HTTP_RANGE' in request.META:
+            response = self.serve_range(
+                request, path, stat_result.st_size, content_type
+            )
+        if response is None and not is_static and getattr(
+            settings, 'SENDFILE_HEADER', None
+        ):
+            response = self.sendfile(name, path, content_type)
+        elif response is None:
+            encoding = None
+            if is_static:
+                encoding, path = self.pick_encoding(request, path)
+                headers['Vary'] = 'Accept-Encoding'
+            response = FileResponse(
+                open(path, 'rb'), content_type=content_type
+            )
+            response['Content-Length'] = os.path.getsize(path)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        return self.with_headers(response, headers)
+
+    @staticmethod
+    def find_file(root, name):
+        try:
+            path = safe_join(root, name)
+            stat_result = os.stat(path)
+        except (SuspiciousFileOperation, OSError):
+            return None, None
+        if not stat.S_ISREG(stat_result.st_mode):
+            return None, None
+        return path, stat_result
+
+    @staticmethod
+    def not_modified(request, etag, stat_result):
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            return request.META['HTTP_IF_NONE_MATCH'] == etag
+        return not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat_result.st_mtime, stat_result.st_size,
+        )
+
+    @staticmethod
+    def pick_encoding(request, path):
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, suffix in ENCODINGS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return encoding, path + suffix
+        return None, path
+
+    @staticmethod
+    def cache_control(name):
+        if HASHED_NAME_RE.search('/' + name):
+            return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        return f'public, max-age={DEFAULT_MAX_AGE}'
+
+    @staticmethod
+    def with_headers(response, headers):
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    @staticmethod
+    def serve_range(request, path, size, content_type):
+        """Ответ 206 на одиночный диапазон байтов.
+
+        Непонятный заголовок и несколько диапазонов сразу игнорируются
+        (возвращается None, и файл отдаётся целиком), 416 получает
+        только корректный, но невыполнимый диапазон.
+        """
+        match = RANGE_RE.match(request.META['HTTP_RANGE'].strip())
+        if not match or not any(match.groups()):
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            read_range(path, start, length),
+            status=206, content_type=content_type,
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+    @staticmethod
+    def sendfile(name, path, content_type):
+        response = HttpResponse(content_type=content_type)
+        header = settings.SENDFILE_HEADER
+        if header == 'X-Accel-Redirect':
+            response[header] = settings.SENDFILE_URL + name
+        else:
+            response[header] = path
+        return response
+
+
+def minify_html(html):
+    """Убирает комментарии и лишние пробелы вне ``pre``, ``script`` и т.п."""
+    parts = PRESERVED_RE.split(html)
+    result = []
+    # split возвращает: текст, блок, имя тега, текст, блок, имя тега...
+    for index in range(0, len(parts), 3):
+        text = HTML_COMMENT_RE.sub('', parts[index])
+        result.append(WHITESPACE_RE.sub(' ', text))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result).strip()
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content)
+    return gzip.compress(content, 6, mtime=0)
+
+
+class CompressionMiddleware:
+    """Минифицирует HTML и сжимает ответы gzip или brotli.
+
+    Сжатое тело хранится в кэше под хэшем исходного, поэтому одинаковые
+    страницы (например, собранные из закэшированных фрагментов)
+    повторно не сжимаются. Кэшируются только общие для всех ответы:
+    страницы пользователей и ответы с CSRF-токеном или cookie уникальны,
+    их записи в кэше никогда бы не прочитались и лишь вытесняли бы
+    сессии и фрагменты.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.status_code != 200
+            or response.has_header('Content-Encoding')
+        ):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.pick_encoding(request)
+        if self.is_shared(request, response):
+            digest = hashlib.md5(content_type.encode())
+            digest.update(response.content)
+            key = 'compressed:{}:{}'.format(encoding, digest.hexdigest())
+            cached = cache.get(key)
+            if cached is None:
+                cached = self.encode(response, content_type, encoding)
+                cache.set(key, cached, COMPRESSED_CACHE_TIMEOUT)
+            content, encoding = cached
+        else:
+            content, encoding = self.encode(response, content_type, encoding)
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        if encoding:
+            response['Content-Encoding'] = encoding
+            if response.has_header('ETag'):
+                response['ETag'] = response['ETag'].rstrip('"') + '-z"'
+        return response
+
+    @staticmethod
+    def is_shared(request, response):
+        user = getattr(request, 'user', None)
+        return not (
+            request.META.get('CSRF_COOKIE_USED')
+            or response.cookies
+            or user is not None and user.is_authenticated
+        )
+
+    @staticmethod
+    def encode(response, content_type, encoding):
+        content = response.content
+        if content_type.startswith('text/html'):
+            content = minify_html(
+                content.decode(response.charset)
+            ).encode(response.charset)
+        if encoding and len(content) >= MIN_COMPRESS_LENGTH:
+            return compress(content, encoding), encoding
+        return content, None
+
+    @staticmethod
+    def pick_encoding(request):
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """``request.user`` без запроса к таблице пользователей.
+
+    Пользователь берётся из общего кеша (см. ``core.auth``), сброс
+    происходит при сохранении пользователя и при выходе.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class IdentityMapMiddleware:
+    """Открывает карту объектов на время обработки запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_scope():
+            return self.get_response(request)
@@ -0,0 +1,58 @@
+from django.db import models
+from django.utils import timezone
+
+
+class MediaBlob(models.Model):
+    """Счётчик ссылок на файл в хранилище с адресацией по содержимому."""
+
+    name = models.CharField(max_length=255, unique=True)
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
+
+
+class Task(models.Model):
+    """Отложенная задача фоновой очереди."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=255)
+    payload = models.TextField(default='{}')
+    key = models.CharField(max_length=255, blank=True, null=True)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('-priority', 'run_at', 'id')
+        indexes = (models.Index(fields=('status', 'run_at')),)
+        constraints = (
+            # Ключ не даёт поставить вторую такую же задачу, пока первая
+            # ещё ждёт своей очереди.
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(status='pending'),
+                name='unique_pending_task_key',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -0,0 +1,78 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """Превращает запись вида ``'10/m'`` в пару (число, секунды)."""
+    count, unit = rate.split('/')
+    return int(count), UNITS[unit]
+
+
+def hit(key, limit, period, now=None):
+    """Учитывает запрос и возвращает, сколько секунд ждать (0 — можно).
+
+    Используется скользящее окно из двух счётчиков: текущий период
+    увеличивается атомарным ``incr`` в кэше, а счётчик прошлого периода
+    учитывается с весом оставшейся доли окна. Это ведёт себя как
+    корзина на ``limit`` токенов, пополняемая равномерно за ``period``.
+    """
+    now = time.time() if now is None else now
+    window = int(now // period)
+    elapsed = now / period - window
+    current_key = f'ratelimit:{key}:{window}'
+    cache.add(current_key, 0, period * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        cache.set(current_key, 1, period * 2)
+        current = 1
+    previous = cache.get(f'ratelimit:{key}:{window - 1}', 0)
+    used = previous * (1 - elapsed) + current
+    if used <= limit:
+        return 0
+    return max(1, math.ceil((1 - elapsed) * period))
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def ratelimit(scope, user_rate=None, ip_rate=None, methods=('POST',)):
+    """Ограничивает частоту запросов к представлению.
+
+    Лимиты задаются для пользователя и для IP-адреса, их можно
+    переопределить в ``settings.RATELIMITS[scope]``. При превышении
+    возвращается ответ 429 с заголовком ``Retry-After``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            rates = dict(user=user_rate, ip=ip_rate)
+            rates.update(getattr(settings, 'RATELIMITS', {}).get(scope, {}))
+            keys = []
+            if rates['user'] and request.user.is_authenticated:
+                keys.append((f'{scope}:user:{request.user.pk}', rates['user']))
+            if rates['ip']:
+                keys.append((f'{scope}:ip:{client_ip(request)}', rates['ip']))
+            retry_after = max(
+                [hit(key, *parse_rate(rate)) for key, rate in keys] or [0]
+            )
+            if retry_after:
+                response = render(
+                    request, 'core/429.html', {'retry_after': retry_after},
+                    status=429,
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
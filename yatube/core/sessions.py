@@ -0,0 +1,42 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+from .tasks import enqueue, task
+
+PURGE_BATCH = 1000
+
+
+def schedule_session_purge():
+    """Планирует очистку сессий, если она ещё не запланирована."""
+    enqueue(
+        purge_expired_sessions, key='purge_sessions',
+        delay=settings.SESSION_PURGE_INTERVAL
+    )
+
+
+@task(atomic=False)
+def purge_expired_sessions():
+    """Удаляет истёкшие сессии порциями и планирует следующий запуск.
+
+    Порции не держат блокировку таблицы сессий надолго, в отличие от
+    одного большого DELETE в ``clearsessions``.
+    """
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    deleted = 0
+    if hasattr(store, 'get_model_class'):
+        expired = store.get_model_class().objects.filter(
+            expire_date__lt=timezone.now()
+        )
+        while True:
+            keys = list(
+                expired.values_list('pk', flat=True)[:PURGE_BATCH]
+            )
+            if not keys:
+                break
+            deleted += expired.filter(pk__in=keys).delete()[0]
+    else:
+        store.clear_expired()
+    schedule_session_purge()
+    return deleted
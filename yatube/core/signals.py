@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import invalidate_cached_user, is_login_stamp
+from .identity import forget
+from .twolevel import sync_all
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_saved_user(sender, instance, update_fields=None, **kwargs):
+    if is_login_stamp(update_fields):
+        return
+    invalidate_cached_user(instance.pk)
+    forget(instance)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        invalidate_cached_user(user.pk)
+
+
+request_started.connect(sync_all, dispatch_uid='core.twolevel.sync_all')
@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import logging
+import os
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+from .models import MediaBlob
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый уникальный файл один раз под именем из его хэша.
+
+    Файл ``posts/meme.jpg`` сохраняется как ``posts/ab/cdef….jpg``;
+    повторная загрузка того же содержимого возвращает уже сохранённое
+    имя. Поскольку имена совпадают, миниатюры дубликатов тоже общие.
+
+    ``save`` сам берёт ссылку на файл (см. :func:`acquire`) ещё до
+    проверки его наличия, поэтому параллельное удаление последней
+    ссылки не сотрёт файл, который вот-вот станет нужен. Снимать ссылку
+    и удалять файлы нужно через :func:`release`.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        acquire(name)
+        if self.exists(name):
+            return name
+        saved = self._save(name, content)
+        if saved != name:
+            # Тот же файл параллельно записал другой процесс.
+            acquire(saved)
+            release(name, self)
+        return saved
+
+    @staticmethod
+    def hashed_name(name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        digest = digest.hexdigest()
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], digest[2:] + extension)
+
+
+def acquire(name):
+    """Учитывает ещё одну ссылку на файл."""
+    if not name:
+        return
+    # Строку могли удалить между созданием и обновлением (её удаляет
+    # _delete_orphan): тогда она создаётся заново.
+    while True:
+        MediaBlob.objects.get_or_create(name=name)
+        if MediaBlob.objects.filter(name=name).update(
+            references=F('references') + 1
+        ):
+            return
+
+
+def release(name, storage):
+    """Снимает ссылку на файл и удаляет его, когда ссылок не осталось."""
+    if not name:
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(
+            name=name
+        ).first()
+        if blob is not None and blob.references > 1:
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                references=F('references') - 1
+            )
+            return
+        if blob is not None:
+            blob.delete()
+    transaction.on_commit(lambda: _delete_orphan(name, storage))
+
+
+def _delete_orphan(name, storage):
+    # Строка счётчика заблокирована на время проверки и удаления файла:
+    # параллельный acquire либо успел раньше, и файл остаётся, либо
+    # дождётся удаления строки и файл будет записан заново.
+    with transaction.atomic():
+        blob, _ = MediaBlob.objects.get_or_create(name=name)
+        blob = MediaBlob.objects.select_for_update().get(pk=blob.pk)
+        if blob.references:
+            return
+        try:
+            storage.delete(name)
+        except (OSError, SuspiciousFileOperation):
+            logger.warning(
+                'Не удалось удалить файл %s', name, exc_info=True
+            )
+        blob.delete()
+
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map', '.ico',
+)
+
+
+def compress_file(path):
+    """Сохраняет рядом с файлом сжатые копии ``.gz`` и ``.br``.
+
+    Копия пишется, только если она заметно меньше оригинала.
+    """
+    with open(path, 'rb') as source:
+        content = source.read()
+    variants = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress))
+    for suffix, compress in variants:
+        compressed = compress(content)
+        if len(compressed) < len(content) * 0.95:
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшами в именах и заранее сжатыми копиями файлов."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if (
+                not dry_run and hashed_name
+                and hashed_name.endswith(COMPRESSIBLE_EXTENSIONS)
+            ):
+                compress_file(self.path(name))
+                compress_file(self.path(hashed_name))
+            yield name, hashed_name, processed
@@ -0,0 +1,182 @@
+import json
+import logging
+import traceback
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+# Повторы идут через 10 с, 20 с, 40 с ... но не реже раза в час.
+BACKOFF_BASE = 10
+BACKOFF_MAX = 60 * 60
+# Сколько задача может выполняться, прежде чем её заберёт другой воркер.
+LEASE = 60 * 10
+
+_current_task = ContextVar('current_task', default=None)
+
+
+def task(max_attempts=DEFAULT_MAX_ATTEMPTS, atomic=True):
+    """Регистрирует функцию как задачу очереди.
+
+    Имя задачи — путь для импорта функции, поэтому воркеру не нужен
+    отдельный реестр: модуль задачи подгружается при первом запуске.
+    Задачи с ``atomic=False`` сами управляют транзакциями.
+    """
+    def decorator(func):
+        func.task_name = f'{func.__module__}.{func.__qualname__}'
+        func.max_attempts = max_attempts
+        func.atomic = atomic
+        return func
+    return decorator
+
+
+def enqueue(func, kwargs=None, priority=0, key=None, delay=0):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    Воркеры увидят задачу только после фиксации, поэтому она не
+    выполнится над откатившимися данными. Если задача с тем же ``key``
+    уже ждёт очереди, новая не создаётся.
+    """
+    fields = {
+        'name': func.task_name,
+        'payload': json.dumps(kwargs or {}, cls=DjangoJSONEncoder),
+        'key': key,
+        'priority': priority,
+        'max_attempts': func.max_attempts,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+    }
+    if key is None:
+        return Task.objects.create(**fields)
+    pending = Task.objects.filter(key=key, status=Task.PENDING)
+    existing = pending.first()
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            return Task.objects.create(**fields)
+    except IntegrityError:
+        return pending.get()
+
+
+def checkpoint(**kwargs):
+    """Запоминает прогресс выполняемой задачи.
+
+    Аргументы заменяют сохранённые, так что повтор после ошибки начнёт
+    с этого места. Имеет смысл только для задач с ``atomic=False``:
+    в атомарной задаче запись откатится вместе с ошибкой.
+    """
+    task_id = _current_task.get()
+    if task_id is not None:
+        Task.objects.filter(id=task_id).update(
+            payload=json.dumps(kwargs, cls=DjangoJSONEncoder)
+        )
+
+
+def claim(limit, lease=LEASE):
+    """Забирает до ``limit`` готовых к запуску задач, возвращает их id.
+
+    Задача достаётся тому воркеру, чьё условное обновление сработало
+    первым; зависшие задачи с истёкшей арендой забираются повторно.
+    """
+    now = timezone.now()
+    candidates = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+    ).values_list('id', 'status', 'locked_until')[:limit]
+    claimed = []
+    for task_id, status, locked_until in candidates:
+        updated = Task.objects.filter(
+            id=task_id, status=status, locked_until=locked_until
+        ).update(
+            status=Task.RUNNING,
+            locked_until=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(task_id)
+    return claimed
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def execute(task_id):
+    """Выполняет забранную задачу и записывает результат."""
+    task = Task.objects.get(id=task_id)
+    token = _current_task.set(task.id)
+    try:
+        func = import_string(task.name)
+        if getattr(func, 'task_name', None) != task.name:
+            raise ValueError(f'{task.name} не является задачей')
+        with transaction.atomic() if func.atomic else nullcontext():
+            func(**json.loads(task.payload))
+    except Exception:
+        logger.exception('Задача %s (%s) завершилась ошибкой', task.id,
+                         task.name)
+        _retry_or_fail(task, traceback.format_exc())
+        return False
+    finally:
+        _current_task.reset(token)
+    Task.objects.filter(id=task.id).update(
+        status=Task.DONE, locked_until=None, finished=timezone.now()
+    )
+    return True
+
+
+def _retry_or_fail(task, error):
+    now = timezone.now()
+    if task.attempts >= task.max_attempts:
+        changes = {'status': Task.FAILED, 'finished': now}
+    else:
+        changes = {
+            'status': Task.PENDING,
+            'run_at': now + timedelta(seconds=backoff(task.attempts)),
+        }
+    tasks = Task.objects.filter(id=task.id)
+    try:
+        with transaction.atomic():
+            tasks.update(locked_until=None, last_error=error, **changes)
+    except IntegrityError:
+        # Пока задача выполнялась, такую же поставили заново: повтор
+        # выполнит она, продолжив с сохранённого ``checkpoint`` места.
+        _hand_over_progress(task, changes.get('run_at'))
+        tasks.update(
+            status=Task.FAILED, finished=now, locked_until=None,
+            last_error=error
+        )
+
+
+def _hand_over_progress(task, run_at):
+    progress = Task.objects.filter(id=task.id).values_list(
+        'payload', flat=True).get()
+    if progress == task.payload:
+        return
+    changes = {'payload': progress}
+    if run_at is not None:
+        changes['run_at'] = Least('run_at', Value(run_at))
+    Task.objects.filter(key=task.key, status=Task.PENDING).update(**changes)
+
+
+def run_pending(limit=100):
+    """Синхронно выполняет готовые задачи; возвращает их число."""
+    done = 0
+    while done < limit:
+        claimed = claim(min(limit - done, 10))
+        if not claimed:
+            break
+        for task_id in claimed:
+            execute(task_id)
+        done += len(claimed)
+    return done
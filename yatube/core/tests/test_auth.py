@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.contrib.auth.models import update_last_login
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='auth', password='old-password'
+        )
+        self.client = Client()
+        self.client.login(username='auth', password='old-password')
+
+    def test_user_served_from_cache(self):
+        """Повторный запрос не обращается к таблице пользователей."""
+        self.client.get(reverse('about:author'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_drops_other_sessions(self):
+        """После смены пароля старая сессия больше не действует."""
+        self.client.get(reverse('about:author'))
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_profile_edit_visible_at_once(self):
+        """Изменённые данные пользователя видны в следующем запросе."""
+        self.client.get(reverse('about:author'))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+
+    def test_logout_forgets_user(self):
+        """После выхода пользователь не остаётся в кеше."""
+        self.client.get(reverse('about:author'))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(f'auth_user:{self.user.pk}'))
+
+    def test_login_stamp_keeps_cache(self):
+        """Отметка о входе не сбрасывает закешированного пользователя."""
+        self.client.get(reverse('about:author'))
+        update_last_login(None, self.user)
+        self.assertIsNotNone(cache.get(f'auth_user:{self.user.pk}'))
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts.models import Comment, Group, Post
+
+from ..identity import entity_cache, identity_scope
+
+User = get_user_model()
+
+
+class IdentityMapTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Первый', group=cls.group
+        )
+        Post.objects.create(author=cls.user, text='Второй', group=cls.group)
+        Comment.objects.create(post=cls.post, author=cls.user, text='Ответ')
+
+    def setUp(self):
+        cache.clear()
+        entity_cache.clear_local()
+
+    def test_one_instance_per_row(self):
+        """Автор и группа создаются один раз на весь запрос."""
+        with identity_scope(), self.assertNumQueries(4):
+            posts = list(Post.objects.with_identity('author', 'group'))
+            comments = list(
+                Comment.objects.with_identity('author').filter(
+                    post=self.post
+                )
+            )
+        self.assertIs(posts[0].author, posts[1].author)
+        self.assertIs(posts[0].group, posts[1].group)
+        self.assertIs(comments[0].author, posts[0].author)
+
+    def test_entities_cached_between_requests(self):
+        """В следующем запросе авторы и группы берутся из кеша."""
+        with identity_scope():
+            list(Post.objects.with_identity('author', 'group'))
+        with identity_scope(), self.assertNumQueries(1):
+            posts = list(Post.objects.with_identity('author', 'group'))
+        self.assertEqual(posts[0].author, self.user)
+
+    def test_saved_user_reloaded(self):
+        """После сохранения пользователь перечитывается из базы."""
+        with identity_scope():
+            list(Post.objects.with_identity('author'))
+        self.user.first_name = 'Имя'
+        self.user.save()
+        with identity_scope():
+            post = Post.objects.with_identity('author').first()
+        self.assertEqual(post.author.first_name, 'Имя')
@@ -0,0 +1,173 @@
+import gzip
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import (
+    CompressionMiddleware, StaticFilesMiddleware, compress, minify_html
+)
+from ..storage import compress_file
+
+STATIC_ROOT = tempfile.mkdtemp()
+MEDIA_ROOT = tempfile.mkdtemp()
+CSS = b'body { color: red; }\n' * 50
+
+
+@override_settings(
+    STATIC_URL='/static/', STATIC_ROOT=STATIC_ROOT,
+    MEDIA_URL='/media/', MEDIA_ROOT=MEDIA_ROOT,
+)
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('app.0123456789ab.css', 'plain.css'):
+            path = os.path.join(STATIC_ROOT, name)
+            with open(path, 'wb') as file:
+                file.write(CSS)
+            compress_file(path)
+        with open(os.path.join(MEDIA_ROOT, 'photo.jpg'), 'wb') as file:
+            file.write(b'0123456789')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = StaticFilesMiddleware(
+            lambda request: HttpResponse('view')
+        )
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, **headers))
+
+    def test_hashed_file_served_compressed_and_immutable(self):
+        """Хэшированная статика отдаётся сжатой и кэшируется навсегда."""
+        response = self.get(
+            '/static/app.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), CSS
+        )
+
+    def test_plain_file_served_uncompressed_with_short_cache(self):
+        """Без поддержки сжатия отдаётся исходный файл."""
+        response = self.get('/static/plain.css')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_not_modified_and_range(self):
+        """Поддерживаются условные запросы и диапазоны."""
+        etag = self.get('/media/photo.jpg')['ETag']
+        response = self.get('/media/photo.jpg', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.get('/media/photo.jpg', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        response = self.get('/media/photo.jpg', HTTP_RANGE='bytes=20-')
+        self.assertEqual(response.status_code, 416)
+        for header in ('bytes=0-1,4-5', 'bytes=5-2', 'items=0-1', 'bytes=-'):
+            with self.subTest(header=header):
+                response = self.get('/media/photo.jpg', HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    b''.join(response.streaming_content), b'0123456789'
+                )
+
+    @override_settings(
+        SENDFILE_HEADER='X-Accel-Redirect', SENDFILE_URL='/protected/'
+    )
+    def test_media_handed_to_web_server(self):
+        """Медиафайл можно передать веб-серверу заголовком."""
+        response = self.get('/media/photo.jpg')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/photo.jpg')
+        self.assertEqual(response.content, b'')
+
+    def test_unknown_paths_fall_through(self):
+        """Отсутствующие и небезопасные пути обрабатывает приложение."""
+        for path in ('/static/missing.css', '/media/../secret', '/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).content, b'view')
+
+
+PAGE = (
+    '<html>\n  <body>\n    <!-- комментарий -->\n'
+    '    <p>Текст   записи</p>\n'
+    '    <pre>  код\n    с отступами</pre>\n'
+    + '    <p>Ещё одна запись</p>\n' * 20
+    + '  </body>\n</html>\n'
+)
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = CompressionMiddleware(
+            lambda request: HttpResponse(PAGE)
+        )
+
+    def test_minify_html_keeps_preformatted_text(self):
+        """Минификация убирает комментарии и пробелы, но не трогает pre."""
+        html = minify_html(PAGE)
+        self.assertNotIn('комментарий', html)
+        self.assertIn('<p>Текст записи</p>', html)
+        self.assertIn('<pre>  код\n    с отступами</pre>', html)
+
+    def test_response_compressed_for_supporting_clients(self):
+        """Ответ сжимается, если клиент это поддерживает."""
+        response = self.middleware(
+            self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), minify_html(PAGE)
+        )
+        response = self.middleware(self.factory.get('/'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode(), minify_html(PAGE))
+
+    def test_compressed_body_reused_from_cache(self):
+        """Одинаковая страница сжимается только один раз."""
+        with mock.patch(
+            'core.middleware.compress', wraps=compress
+        ) as compress_mock:
+            for _ in range(3):
+                response = self.middleware(
+                    self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+                )
+        self.assertEqual(compress_mock.call_count, 1)
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), minify_html(PAGE)
+        )
+
+    def test_personal_pages_not_cached(self):
+        """Страницы с CSRF-токеном или cookie сжимаются без кэша."""
+        def set_cookie(request):
+            response = HttpResponse(PAGE)
+            response.set_cookie('sessionid', 'x')
+            return response
+
+        csrf_request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        csrf_request.META['CSRF_COOKIE_USED'] = True
+        with mock.patch('core.middleware.cache.set') as cache_set:
+            response = self.middleware(csrf_request)
+            CompressionMiddleware(set_cookie)(self.factory.get('/'))
+        self.assertFalse(cache_set.called)
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), minify_html(PAGE)
+        )
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..ratelimit import hit
+
+User = get_user_model()
+
+
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_hit_uses_sliding_window(self):
+        """Счётчик прошлого окна учитывается с убывающим весом."""
+        for _ in range(3):
+            self.assertEqual(hit('test', 3, 60, now=60 * 10 + 59), 0)
+        self.assertEqual(hit('test', 3, 60, now=60 * 11 + 1), 59)
+        self.assertEqual(hit('other', 3, 60, now=60 * 11 + 1), 0)
+        self.assertEqual(hit('test', 3, 60, now=60 * 11 + 50), 0)
+
+    @override_settings(RATELIMITS={'add_comment': {'user': '2/m'}})
+    def test_comments_limited_per_user(self):
+        """Слишком частые комментарии получают ответ 429."""
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.id})
+        for _ in range(2):
+            response = self.authorized_client.post(url, {'text': 'Спам'})
+            self.assertEqual(response.status_code, 302)
+        response = self.authorized_client.post(url, {'text': 'Спам'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) > 0)
+        self.assertEqual(self.post.comments.count(), 2)
+
+    @override_settings(RATELIMITS={'signup': {'ip': '1/m'}})
+    def test_signup_limited_per_ip(self):
+        """Регистрация ограничена по IP-адресу, просмотр формы — нет."""
+        url = reverse('users:signup')
+        self.guest_client.post(url, {})
+        self.assertEqual(self.guest_client.post(url, {}).status_code, 429)
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
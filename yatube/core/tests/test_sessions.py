@@ -0,0 +1,63 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Task
+from ..sessions import purge_expired_sessions
+
+User = get_user_model()
+
+
+class SessionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_authorized_request_skips_session_table(self):
+        """Сессия авторизованного пользователя читается из кеша."""
+        client = Client()
+        client.force_login(self.user)
+        client.get('/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/')
+        self.assertFalse(
+            [query for query in queries if 'django_session' in query['sql']]
+        )
+
+    def test_purge_removes_only_expired(self):
+        """Очистка удаляет истёкшие сессии и планирует следующий запуск."""
+        now = timezone.now()
+        for number in range(3):
+            Session.objects.create(
+                session_key=f'expired{number}', session_data='',
+                expire_date=now - timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key='alive', session_data='',
+            expire_date=now + timedelta(days=1),
+        )
+        self.assertEqual(purge_expired_sessions(), 3)
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
+        self.assertTrue(
+            Task.objects.filter(
+                key='purge_sessions', status=Task.PENDING
+            ).exists()
+        )
+
+    def test_benchmark_command(self):
+        """Команда замера выводит результат для каждого хранилища."""
+        out = StringIO()
+        call_command('bench_sessions', requests=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        self.assertFalse(User.objects.filter(username='bench-sessions'))
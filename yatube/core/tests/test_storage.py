@@ -0,0 +1,110 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import Post
+
+from ..models import MediaBlob
+from ..storage import ContentAddressedStorage, _delete_orphan
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTests(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='auth')
+
+    def create_post(self, filename):
+        return Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(filename, SMALL_GIF, 'image/gif'),
+        )
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковые файлы сохраняются один раз под именем из хэша."""
+        storage = ContentAddressedStorage()
+        first = storage.save('posts/one.gif', ContentFile(SMALL_GIF))
+        second = storage.save('posts/two.GIF', ContentFile(SMALL_GIF))
+        self.assertEqual(first, second)
+        self.assertRegex(first, r'^posts/[0-9a-f]{2}/[0-9a-f]{62}\.gif$')
+
+    def test_file_deleted_with_last_reference(self):
+        """Файл удаляется только вместе с последней ссылающейся записью."""
+        first = self.create_post('meme.gif')
+        second = self.create_post('repost.gif')
+        name = first.image.name
+        self.assertEqual(second.image.name, name)
+        self.assertEqual(MediaBlob.objects.get(name=name).references, 2)
+
+        first.delete()
+        self.assertTrue(second.image.storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).references, 1)
+
+        second.delete()
+        self.assertFalse(second.image.storage.exists(name))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_replaced_image_releases_old_file(self):
+        """Замена картинки снимает ссылку со старого файла."""
+        post = self.create_post('meme.gif')
+        old_name = post.image.name
+        post.image = ''
+        post.save()
+        self.assertFalse(post.image.storage.exists(old_name))
+
+    def test_reused_file_survives_concurrent_orphan_cleanup(self):
+        """Уборка осиротевшего файла не удаляет файл, который переиспользуют.
+
+        Удаление запускается сразу после проверки наличия файла, то есть
+        до того, как новая запись сохранена в базе.
+        """
+        storage = ContentAddressedStorage()
+        name = storage._save(
+            storage.hashed_name('posts/old.gif', ContentFile(SMALL_GIF)),
+            ContentFile(SMALL_GIF),
+        )
+        exists = ContentAddressedStorage.exists
+
+        def exists_then_cleanup(self, checked):
+            result = exists(self, checked)
+            _delete_orphan(checked, self)
+            return result
+
+        with mock.patch.object(
+            ContentAddressedStorage, 'exists', exists_then_cleanup
+        ):
+            post = self.create_post('meme.gif')
+        self.assertEqual(post.image.name, name)
+        self.assertTrue(storage.exists(name))
+        self.assertEqual(MediaBlob.objects.get(name=name).references, 1)
+
+    def test_same_image_uploaded_again_keeps_one_reference(self):
+        """Повторная загрузка той же картинки не добавляет ссылку."""
+        post = self.create_post('meme.gif')
+        post.image = SimpleUploadedFile('again.gif', SMALL_GIF, 'image/gif')
+        post.save()
+        self.assertEqual(
+            MediaBlob.objects.get(name=post.image.name).references, 1
+        )
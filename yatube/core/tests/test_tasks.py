@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..models import Task
+from ..tasks import BACKOFF_BASE, claim, enqueue, run_pending, task
+
+CALLS = []
+
+
+@task()
+def record(value):
+    CALLS.append(value)
+
+
+@task(max_attempts=2)
+def broken():
+    raise RuntimeError('сбой')
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_runs_once(self):
+        """Задача выполняется воркером и помечается выполненной."""
+        queued = enqueue(record, {'value': 1})
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(CALLS, [1])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.DONE)
+        self.assertEqual(queued.attempts, 1)
+
+    def test_priority_order(self):
+        """Задачи с большим приоритетом выполняются раньше."""
+        enqueue(record, {'value': 'low'})
+        enqueue(record, {'value': 'high'}, priority=10)
+        run_pending()
+        self.assertEqual(CALLS, ['high', 'low'])
+
+    def test_key_deduplicates_pending(self):
+        """Пока задача ждёт, вторая с тем же ключом не создаётся."""
+        first = enqueue(record, {'value': 1}, key='same')
+        self.assertEqual(enqueue(record, {'value': 2}, key='same'), first)
+        run_pending()
+        enqueue(record, {'value': 3}, key='same')
+        run_pending()
+        self.assertEqual(CALLS, [1, 3])
+
+    def test_delayed_task_waits(self):
+        """Отложенная задача не запускается раньше срока."""
+        enqueue(record, {'value': 1}, delay=60)
+        self.assertEqual(run_pending(), 0)
+
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача откладывается, а после лимита попыток — ошибка."""
+        queued = enqueue(broken)
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertIn('сбой', queued.last_error)
+        self.assertGreaterEqual(
+            queued.run_at,
+            timezone.now() + timedelta(seconds=BACKOFF_BASE - 1)
+        )
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_expired_lease_reclaimed(self):
+        """Задачу зависшего воркера забирают после окончания аренды."""
+        queued = enqueue(record, {'value': 1})
+        self.assertEqual(claim(1), [queued.id])
+        self.assertEqual(claim(1), [])
+        Task.objects.update(locked_until=timezone.now() - timedelta(1))
+        self.assertEqual(claim(1), [queued.id])
+
+
+class RunWorkersTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_run_workers_once(self):
+        """Команда воркеров разбирает очередь и завершается."""
+        for value in range(3):
+            enqueue(record, {'value': value})
+        out = StringIO()
+        call_command('run_workers', once=True, stdout=out)
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+        self.assertIn('3', out.getvalue())
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..twolevel import TwoLevelCache, sync_all
+
+
+class TwoLevelCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = TwoLevelCache('test', maxsize=2, ttl=60)
+
+    def test_local_hits_skip_shared_cache(self):
+        """Повторное чтение обслуживается памятью процесса."""
+        self.cache.set('a', 1)
+        with mock.patch.object(cache, 'get_many') as get_many:
+            self.assertEqual(self.cache.get('a'), 1)
+        get_many.assert_not_called()
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_fallback_to_shared_cache(self):
+        """Промах L1 читает общий кеш и запоминает значение."""
+        cache.set('test:a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('missing'), None)
+        stats = self.cache.stats()
+        self.assertEqual((stats['l2_hits'], stats['l2_misses']), (1, 1))
+
+    def test_size_limit_evicts_oldest(self):
+        """Старейшие по обращению записи вытесняются первыми."""
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertEqual(list(self.cache.entries), ['a', 'c'])
+
+    def test_ttl_expires_local_entry(self):
+        """Устаревшая локальная запись перечитывается из L2."""
+        self.cache.set('a', 1)
+        cache.set('test:a', 2)
+        with mock.patch('core.twolevel.time.monotonic', return_value=1e12):
+            self.assertEqual(self.cache.get('a'), 2)
+
+    def test_delete_reaches_other_processes(self):
+        """Удаление в одном процессе сбрасывает L1 другого при сверке."""
+        other = TwoLevelCache('test', maxsize=2, ttl=60)
+        self.cache.set('a', 1)
+        self.assertEqual(other.get('a'), 1)
+        self.cache.delete('a')
+        sync_all()
+        self.assertIsNone(other.get('a'))
+
+    def test_delete_keeps_other_local_entries(self):
+        """Удаление одного ключа не сбрасывает остальные записи L1."""
+        other = TwoLevelCache('test', maxsize=2, ttl=60)
+        self.cache.set_many({'a': 1, 'b': 2})
+        other.get_many(['a', 'b'])
+        self.cache.delete('a')
+        sync_all()
+        self.assertEqual(list(other.entries), ['b'])
+        with mock.patch.object(cache, 'get_many') as get_many:
+            self.assertEqual(other.get('b'), 2)
+        get_many.assert_not_called()
+
+    def test_incomplete_log_clears_local_cache(self):
+        """Если журнал удалений потерян, L1 сбрасывается целиком."""
+        other = TwoLevelCache('test', maxsize=2, ttl=60)
+        self.cache.set_many({'a': 1, 'b': 2})
+        other.get_many(['a', 'b'])
+        self.cache.delete('a')
+        cache.delete(f'l1_log:test:{cache.get("l1_version:test")}')
+        sync_all()
+        self.assertEqual(list(other.entries), [])
+
+    def test_bump_clears_all_processes(self):
+        """Сброс пространства имён очищает L1 во всех процессах."""
+        other = TwoLevelCache('test', maxsize=2, ttl=60)
+        self.cache.set('a', 1)
+        other.get('a')
+        self.cache.bump()
+        sync_all()
+        self.assertEqual(list(other.entries), [])
+
+    def test_memoize(self):
+        """Декоратор кеширует результат по аргументам."""
+        calls = []
+
+        @self.cache.memoize()
+        def square(value):
+            calls.append(value)
+            return value * value
+
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(3), 9)
+        square.invalidate(3)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(calls, [3, 3])
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from django.core.cache import caches
+
+VERSION_KEY = 'l1_version:{}'
+LOG_KEY = 'l1_log:{}:{}'
+# Сколько последних удалений помнит журнал: отставший сильнее процесс
+# сбрасывает свой L1 целиком.
+LOG_SIZE = 200
+LOG_TIMEOUT = 60 * 60
+# Запись журнала — кортеж удалённых ключей; пустой кортеж означает
+# «сбросить всё пространство имён».
+ALL_KEYS = ()
+# Вне запросов (воркеры, команды) процесс сверяет свою копию с общим
+# кешем не чаще этого интервала, в секундах.
+SYNC_INTERVAL = 1.0
+
+_instances = []
+
+
+class TwoLevelCache:
+    """Ограниченный LRU-кеш процесса перед общим кешем Django.
+
+    Первый уровень (L1) живёт в памяти процесса: не больше ``maxsize``
+    записей, каждая не дольше ``ttl`` секунд. Второй уровень (L2) —
+    настроенный кеш Django. Удаление повышает номер версии пространства
+    имён в L2 и записывает удалённый ключ в журнал под этим номером.
+    Остальные процессы при очередной сверке — в начале каждого запроса
+    (одним обращением к L2 на все экземпляры) и не реже чем раз в
+    ``SYNC_INTERVAL`` — читают пропущенные записи журнала и убирают из
+    L1 только эти ключи. Если журнал неполон (процесс отстал больше
+    чем на ``LOG_SIZE`` удалений или запись вытеснена), L1 сбрасывается
+    целиком.
+    """
+
+    def __init__(self, namespace, maxsize=1024, ttl=60, alias='default'):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.alias = alias
+        self.version_key = VERSION_KEY.format(namespace)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.synced = 0.0
+        self.hits = self.misses = self.l2_hits = self.l2_misses = 0
+        _instances.append(self)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def sync(self, force=False):
+        """Убирает из L1 ключи, удалённые другими процессами."""
+        if force or time.monotonic() - self.synced >= SYNC_INTERVAL:
+            version = self.backend.get(self.version_key)
+            self.apply_version(
+                self.fresh_version() if version is None else version
+            )
+
+    def fresh_version(self):
+        """Заводит номер версии, которого нет в L2 (например, после очистки).
+
+        Начальное значение берётся по времени, поэтому процессы, помнящие
+        прежние номера, увидят разрыв и сбросят L1 целиком.
+        """
+        self.backend.add(self.version_key, int(time.time() * 1000), None)
+        return self.backend.get(self.version_key, 0)
+
+    def apply_version(self, version):
+        now = time.monotonic()
+        with self.lock:
+            known = self.version
+        if version != known:
+            stale = self.deleted_since(known, version)
+            with self.lock:
+                if stale is None or ALL_KEYS in stale:
+                    self.entries.clear()
+                else:
+                    for keys in stale:
+                        for key in keys:
+                            self.entries.pop(key, None)
+                self.version = version
+                self.synced = now
+            return
+        with self.lock:
+            self.synced = now
+
+    def deleted_since(self, known, version):
+        """Записи журнала после версии ``known``; None — журнал неполон."""
+        if known is None or not 0 < version - known <= LOG_SIZE:
+            return None
+        log_keys = [
+            LOG_KEY.format(self.namespace, number)
+            for number in range(known + 1, version + 1)
+        ]
+        log = self.backend.get_many(log_keys)
+        if len(log) != len(log_keys):
+            return None
+        return set(log.values())
+
+    def _get_local(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _set_local(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def get_many(self, keys):
+        self.sync()
+        found = {}
+        missing = []
+        for key in keys:
+            entry = self._get_local(key)
+            if entry is None:
+                missing.append(key)
+            else:
+                found[key] = entry[0]
+        if missing:
+            shared = self.backend.get_many([self.key(k) for k in missing])
+            for key in missing:
+                if self.key(key) in shared:
+                    value = shared[self.key(key)]
+                    self._set_local(key, value)
+                    found[key] = value
+                    self.l2_hits += 1
+                else:
+                    self.l2_misses += 1
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, data, timeout=None):
+        """Сохраняет значения; новые ключи не требуют сброса других L1."""
+        self.sync()
+        self.backend.set_many(
+            {self.key(key): value for key, value in data.items()}, timeout
+        )
+        for key, value in data.items():
+            self._set_local(key, value)
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def delete(self, key):
+        """Удаляет значение во всех процессах."""
+        self.backend.delete(self.key(key))
+        with self.lock:
+            self.entries.pop(key, None)
+        self.log((key,))
+
+    def bump(self):
+        """Сбрасывает L1 пространства имён во всех процессах."""
+        self.clear_local()
+        self.log(ALL_KEYS)
+
+    def log(self, keys):
+        try:
+            number = self.backend.incr(self.version_key)
+        except ValueError:
+            self.fresh_version()
+            number = self.backend.incr(self.version_key)
+        self.backend.set(
+            LOG_KEY.format(self.namespace, number), keys, LOG_TIMEOUT
+        )
+        self.sync(force=True)
+
+    def get_or_set(self, key, default, timeout=None):
+        value = self.get(key)
+        if value is None:
+            value = default()
+            self.set(key, value, timeout)
+        return value
+
+    def memoize(self, timeout=None):
+        """Декоратор: кеширует результат функции по её аргументам."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args):
+                key = ':'.join([func.__qualname__, *map(str, args)])
+                return self.get_or_set(key, lambda: func(*args), timeout)
+            wrapper.invalidate = lambda *args: self.delete(
+                ':'.join([func.__qualname__, *map(str, args)])
+            )
+            return wrapper
+        return decorator
+
+    def clear_local(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Счётчики попаданий для мониторинга."""
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'l2_hits': self.l2_hits,
+            'l2_misses': self.l2_misses,
+        }
+
+
+def sync_all(**kwargs):
+    """Сверяет все кеши процесса с L2; вызывается в начале запроса."""
+    by_alias = defaultdict(list)
+    for instance in _instances:
+        by_alias[instance.alias].append(instance)
+    for alias, instances in by_alias.items():
+        versions = caches[alias].get_many(
+            [instance.version_key for instance in instances]
+        )
+        for instance in instances:
+            version = versions.get(instance.version_key)
+            instance.apply_version(
+                instance.fresh_version() if version is None else version
+            )
@@ -1,8 +1,57 @@
+from hashlib import md5
+
 from django.contrib import admin
-from .models import Post, Group
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import (
+    Comment, Follow, Group, GroupDailyStats, GroupStats, Post, PostRevision,
+    Tag
+)
+
+ESTIMATED_COUNT_TIMEOUT = 60 * 5
+
+
+class EstimatedCountPaginator(Paginator):
+    """Паджинатор, не считающий строки огромных таблиц на каждый запрос.
+
+    Для PostgreSQL без фильтров берёт оценку из статистики планировщика,
+    в остальных случаях кэширует точное число строк на несколько минут.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return int(row[0])
+        try:
+            sql = str(queryset.query)
+        except Exception:
+            return super().count
+        key = 'admin_count:' + md5(sql.encode()).hexdigest()
+        return cache.get_or_set(
+            key, lambda: Paginator.count.func(self), ESTIMATED_COUNT_TIMEOUT
+        )
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Общие настройки списков для больших таблиц."""
 
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-class PostAdmin(admin.ModelAdmin):
+
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'text',
@@ -10,11 +59,80 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
+    autocomplete_fields = ('author', 'group')
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
 
 
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
+
+class CommentAdmin(LargeTableAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'created',
+        'author',
+        'post',
+    )
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    autocomplete_fields = ('author', 'post')
+    date_hierarchy = 'created'
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+
+
+class GroupStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'group',
+        'posts_count',
+        'authors_count',
+        'comments_count',
+    )
+    list_select_related = ('group',)
+    readonly_fields = list_display
+
+
+class GroupDailyStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'group',
+        'day',
+        'posts_count',
+        'comments_count',
+    )
+    list_filter = ('group',)
+    list_select_related = ('group',)
+    date_hierarchy = 'day'
+    readonly_fields = list_display
+
+
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name')
+    search_fields = ('name',)
+
+
+class PostRevisionAdmin(LargeTableAdmin):
+    list_display = ('pk', 'post', 'number', 'snapshot', 'size', 'created')
+    raw_id_fields = ('post',)
+
+
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(GroupStats, GroupStatsAdmin)
+admin.site.register(GroupDailyStats, GroupDailyStatsAdmin)
+admin.site.register(PostRevision, PostRevisionAdmin)
+admin.site.register(Tag, TagAdmin)
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from itertools import chain, groupby
+from operator import attrgetter, itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core.tasks import checkpoint, enqueue, task
+
+from .models import Follow, NewPostEvent
+
+# Письма собираются за это время после первой новой записи.
+DIGEST_WINDOW = 60 * 60
+DIGEST_SUBJECT = 'Новые записи авторов, на которых вы подписаны'
+FOLLOW_CHUNK = 2000
+SEND_BATCH = 100
+
+
+def record_new_post(post):
+    """Запоминает новую запись и планирует рассылку в конце окна."""
+    NewPostEvent.objects.create(post=post)
+    schedule_digests()
+
+
+def _digest(username, email, posts):
+    body = render_to_string('posts/email/digest.txt', {
+        'username': username,
+        'posts': posts,
+        'site_url': settings.SITE_URL,
+    })
+    return EmailMessage(DIGEST_SUBJECT, body, to=[email])
+
+
+def schedule_digests():
+    enqueue(send_digests, key='follower_digest', delay=DIGEST_WINDOW)
+
+
+@task(atomic=False)
+def send_digests(last_event=None, after_user=0):
+    """Отправляет каждому подписчику одно письмо обо всех новых записях.
+
+    Подписки читаются из базы порциями, а письма уходят пачками через
+    одно соединение с почтовым сервером. Задача не держит транзакцию
+    на время отправки: после каждой пачки прогресс (последнее событие
+    рассылки и последний получатель) сохраняется, и повтор после ошибки
+    не шлёт письма тем, кто их уже получил.
+    """
+    events = NewPostEvent.objects.select_related('post__author')
+    if last_event is not None:
+        events = events.filter(id__lte=last_event)
+    events = list(events)
+    if not events:
+        return 0
+    last_event = max(event.id for event in events)
+    posts = defaultdict(list)
+    for event in sorted(events, key=attrgetter('post.pub_date')):
+        posts[event.post.author_id].append(event.post)
+    followers = Follow.objects.filter(
+        author_id__in=posts, user__is_active=True, user_id__gt=after_user
+    ).exclude(user__email='').order_by('user_id').values_list(
+        'user_id', 'user__username', 'user__email', 'author_id'
+    ).iterator(chunk_size=FOLLOW_CHUNK)
+    sent = 0
+    batch = []
+    with get_connection() as connection:
+        for (user_id, username, email), rows in groupby(
+            followers, key=itemgetter(0, 1, 2)
+        ):
+            digest_posts = sorted(
+                chain.from_iterable(posts[row[3]] for row in rows),
+                key=attrgetter('pub_date'),
+            )
+            batch.append(_digest(username, email, digest_posts))
+            if len(batch) >= SEND_BATCH:
+                sent += connection.send_messages(batch) or 0
+                checkpoint(last_event=last_event, after_user=user_id)
+                batch = []
+        if batch:
+            sent += connection.send_messages(batch) or 0
+    with transaction.atomic():
+        NewPostEvent.objects.filter(
+            id__in=[event.id for event in events]
+        ).delete()
+        # Записи, появившиеся во время рассылки, уйдут следующей.
+        if NewPostEvent.objects.exists():
+            schedule_digests()
+    return sent
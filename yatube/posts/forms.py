@@ -1,5 +1,6 @@
 from django import forms
 
+from .images import validate_upload
 from .models import Comment, Post
 
 
@@ -16,6 +17,12 @@ class PostForm(forms.ModelForm):
             'group': 'Группа, к которой будет относиться пост',
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if image and 'image' in self.changed_data:
+            validate_upload(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
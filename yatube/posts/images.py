@@ -0,0 +1,124 @@
+import io
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.models import MediaBlob
+from core.storage import release
+from core.tasks import enqueue, task
+
+from .models import Post
+from .utils import invalidate_post_detail
+
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+MAX_UPLOAD_SIDE = 10000
+MAX_UPLOAD_PIXELS = 40_000_000
+# Размер, до которого уменьшаются картинки при сохранении.
+MAX_STORED_SIDE = 1920
+JPEG_QUALITY = 85
+
+
+def validate_upload(upload):
+    """Проверяет размер файла и картинки, не декодируя её целиком."""
+    if upload.size > MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            f'Файл больше {MAX_UPLOAD_SIZE // (1024 * 1024)} МБ.'
+        )
+    upload.seek(0)
+    with Image.open(upload) as image:
+        width, height = image.size
+    upload.seek(0)
+    if max(width, height) > MAX_UPLOAD_SIDE:
+        raise ValidationError(
+            f'Сторона картинки больше {MAX_UPLOAD_SIDE} пикселей.'
+        )
+    if width * height > MAX_UPLOAD_PIXELS:
+        raise ValidationError('Слишком большое разрешение картинки.')
+
+
+def reencode(source):
+    """Перекодирует картинку для хранения.
+
+    Поворачивает по EXIF, отбрасывает метаданные и уменьшает до
+    ``MAX_STORED_SIDE``. Возвращает ``(содержимое, расширение)`` или
+    ``None``, если картинку лучше оставить как есть (например, анимацию).
+    """
+    with Image.open(source) as image:
+        if getattr(image, 'is_animated', False):
+            return None
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((MAX_STORED_SIDE, MAX_STORED_SIDE), Image.LANCZOS)
+        has_alpha = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        # Новое изображение создаётся без info, поэтому EXIF не переносится.
+        buffer = io.BytesIO()
+        if has_alpha:
+            image.convert('RGBA').save(buffer, 'PNG', optimize=True)
+            return buffer.getvalue(), 'png'
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True,
+            progressive=True,
+        )
+        return buffer.getvalue(), 'jpg'
+
+
+@task(max_attempts=3)
+def process_post_image(post_id):
+    """Заменяет картинку записи перекодированной версией."""
+    post = Post.objects.filter(id=post_id).only('id', 'image').first()
+    if post is None or not post.image:
+        return
+    storage = post.image.storage
+    old_name = post.image.name
+    with storage.open(old_name) as source:
+        result = reencode(source)
+    if result is None:
+        return
+    content, extension = result
+    base = os.path.splitext(os.path.basename(old_name))[0]
+    new_name = storage.save(
+        f'posts/{base}.{extension}', ContentFile(content)
+    )
+    if new_name == old_name:
+        # Ссылку, взятую при сохранении, держит сама запись.
+        release(new_name, storage)
+        return
+    updated = Post.objects.filter(id=post_id, image=old_name).update(
+        image=new_name, updated=timezone.now()
+    )
+    if updated:
+        release(old_name, storage)
+        invalidate_post_detail(post_id)
+    else:
+        # Пока шла обработка, картинку успели заменить.
+        release(new_name, storage)
+
+
+def schedule_image_processing(post_id):
+    """Ставит обработку картинки в фоновую очередь.
+
+    Запрос на загрузку не ждёт перекодирования, а повторные правки
+    записи до запуска задачи не плодят лишних обработок.
+    """
+    enqueue(
+        process_post_image, {'post_id': post_id}, key=f'post_image:{post_id}'
+    )
+
+
+def recount_image_references():
+    """Пересчитывает ссылки на картинки после пакетных вставок."""
+    references = Post.objects.exclude(image='').order_by().values(
+        'image'
+    ).annotate(total=Count('id'))
+    with transaction.atomic():
+        MediaBlob.objects.all().delete()
+        MediaBlob.objects.bulk_create(
+            MediaBlob(name=row['image'], references=row['total'])
+            for row in references.iterator()
+        )
@@ -0,0 +1,64 @@
+from hashlib import md5
+
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from core.identity import remember
+from core.twolevel import TwoLevelCache
+
+from .models import Group
+
+User = get_user_model()
+
+LOOKUP_CACHE_TIMEOUT = 60 * 10
+# Несуществующие адреса помним недолго: этого хватает, чтобы перебор
+# профилей не доходил до базы, а новый пользователь появился быстро.
+MISSING_CACHE_TIMEOUT = 60
+AUTHOR_CACHE_KEY = 'author:{}'
+GROUP_CACHE_KEY = 'group:{}'
+
+lookup_cache = TwoLevelCache('lookups', maxsize=4096, ttl=60)
+
+
+def author_cache_key(username):
+    return AUTHOR_CACHE_KEY.format(md5(username.encode()).hexdigest())
+
+
+def group_cache_key(slug):
+    return GROUP_CACHE_KEY.format(slug)
+
+
+def _lookup(key, queryset, **lookup):
+    record = lookup_cache.get(key)
+    if record is None:
+        record = queryset.filter(**lookup).first() or False
+        lookup_cache.set(
+            key, record,
+            LOOKUP_CACHE_TIMEOUT if record else MISSING_CACHE_TIMEOUT
+        )
+    if not record:
+        raise Http404('Не найдено')
+    remember(record)
+    return record
+
+
+def get_author(username):
+    """Автор по имени пользователя с кешированием, в том числе 404."""
+    return _lookup(
+        author_cache_key(username),
+        User.objects.only('id', 'username', 'first_name', 'last_name'),
+        username=username,
+    )
+
+
+def get_group(slug):
+    """Группа по адресу с кешированием, в том числе 404."""
+    return _lookup(group_cache_key(slug), Group.objects, slug=slug)
+
+
+def invalidate_author(username):
+    lookup_cache.delete(author_cache_key(username))
+
+
+def invalidate_group(slug):
+    lookup_cache.delete(group_cache_key(slug))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Template
+
+from posts.models import Post
+from posts.templatetags.post_cards import card_cache, card_cache_key
+
+# Разметка ленты до выноса карточки в общий компонент.
+INLINE_CARDS = Template('''{% load thumbnail %}
+{% for post in posts %}
+<ul>
+  <li>
+    Автор: {{ post.author.get_full_name }}
+    <a href="{% url 'posts:profile' post.author.username %}">
+      все посты пользователя</a>
+  </li>
+  <li>
+    Дата публикации: {{ post.pub_date|date:"d E Y" }}
+  </li>
+</ul>
+{% thumbnail post.image "960x339" crop="center" upscale=True as im %}
+  <img class="card-img my-2" src="{{ im.url }}">
+{% endthumbnail %}
+<p>{{ post.text }}</p>
+<a href="{% url 'posts:post_detail' post.id %}">подробная информация </a><br>
+{% if post.group %}
+<a href="{% url 'posts:group_posts' post.group.slug %}">все записи группы</a>
+{% endif %}
+{% if not forloop.last %}<hr>{% endif %}
+{% endfor %}''')
+COMPONENT_CARDS = Template('''{% load post_cards %}
+{% post_cards posts as cards %}
+{% for card in cards %}
+{{ card }}
+{% if not forloop.last %}<hr>{% endif %}
+{% endfor %}''')
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время отрисовки ленты до и после кеша карточек.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        posts = list(
+            Post.objects.select_related('author', 'group')[:options['posts']]
+        )
+        if not posts:
+            raise CommandError('В базе нет записей, запустите seed_scale.')
+        context = Context({'posts': posts})
+        keys = [card_cache_key(post, True) for post in posts]
+
+        def cold():
+            cache.delete_many([card_cache.key(key) for key in keys])
+            card_cache.clear_local()
+            COMPONENT_CARDS.render(context)
+
+        def shared():
+            card_cache.clear_local()
+            COMPONENT_CARDS.render(context)
+
+        results = (
+            ('встроенная разметка', lambda: INLINE_CARDS.render(context)),
+            ('компонент, пустой кеш', cold),
+            ('компонент, общий кеш', shared),
+            ('компонент, память процесса',
+             lambda: COMPONENT_CARDS.render(context)),
+        )
+        for title, render in results:
+            render()
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                render()
+            elapsed = (time.perf_counter() - started) / options['repeat']
+            self.stdout.write(
+                f'{title}: {elapsed * 1000:.2f} мс на {len(posts)} записей'
+            )
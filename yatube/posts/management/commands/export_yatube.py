@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.transfer import CHUNK_SIZE, export_data
+
+
+class Command(BaseCommand):
+    help = 'Выгружает пользователей, группы, записи, комментарии и подписки.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для выгрузки.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        counts = export_data(options['directory'], options['chunk_size'])
+        for label, total in counts.items():
+            self.stdout.write(f'{label}: {total}')
@@ -0,0 +1,25 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from posts.images import recount_image_references
+from posts.stats import reconcile_group_stats
+from posts.transfer import CHUNK_SIZE, import_data
+
+
+class Command(BaseCommand):
+    help = 'Загружает выгрузку, сделанную командой export_yatube.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог с выгрузкой.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        counts = import_data(options['directory'], options['chunk_size'])
+        for label, total in counts.items():
+            self.stdout.write(f'{label}: {total}')
+        # Пакетные вставки не вызывают сигналы, поэтому счётчики
+        # групп и ссылок на картинки пересчитываются целиком, а тексты
+        # записей размечаются заново.
+        reconcile_group_stats()
+        recount_image_references()
+        call_command('render_posts', missing=True, stdout=self.stdout)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.ranking import TRENDING_TOP, rebuild_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает ленты популярных записей (запускать по расписанию).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=TRENDING_TOP,
+            help='Сколько записей хранить в каждой ленте.'
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_trending(top=options['top'])
+        self.stdout.write(f'Сохранено записей в рейтинге: {total}')
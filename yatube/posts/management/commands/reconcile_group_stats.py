@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import reconcile_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику групп с нуля (запускать раз в сутки).'
+
+    def handle(self, *args, **options):
+        groups, days = reconcile_group_stats()
+        self.stdout.write(
+            f'Пересчитано групп: {groups}, дневных записей: {days}'
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from posts.markup import (
+    existing_usernames, mentioned_usernames, render_markup
+)
+from posts.models import Post
+from posts.tags import index_post
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Заново размечает тексты записей и обновляет индекс тегов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing', action='store_true',
+            help='Только записи, которые ещё не размечены.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('id').only('id', 'text')
+        if options['missing']:
+            posts = posts.filter(text_html='')
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            usernames = existing_usernames(set().union(
+                *(mentioned_usernames(post.text) for post in batch)
+            ))
+            for post in batch:
+                post.text_html = render_markup(post.text, usernames)
+                index_post(post)
+            Post.objects.bulk_update(batch, ['text_html'])
+            total += len(batch)
+            last_id = batch[-1].id
+        self.stdout.write(f'Размечено записей: {total}')
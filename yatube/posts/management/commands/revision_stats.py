@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.revisions import storage_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает, сколько места занимает история правок записей.'
+
+    def handle(self, *args, **options):
+        stats = storage_stats()
+        self.stdout.write(
+            f'Записей с историей: {stats["posts"]}, '
+            f'версий: {stats["revisions"]}, снимков: {stats["snapshots"]}'
+        )
+        self.stdout.write(
+            f'Хранится символов: {stats["stored"]}, '
+            f'полные копии заняли бы: {stats["full"]} '
+            f'({stats["ratio"]:.0%})'
+        )
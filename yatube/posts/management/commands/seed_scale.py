@@ -0,0 +1,48 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from posts.seeding import seed_scale
+from posts.stats import reconcile_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для нагрузочных проверок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Сколько разных картинок сгенерировать для записей.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней распределить записи.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--processes', type=int, default=None,
+            help='Число процессов-генераторов (по умолчанию по числу ядер).'
+        )
+
+    def handle(self, *args, **options):
+        seed_scale(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            images=options['images'],
+            days=options['days'],
+            seed=options['seed'],
+            processes=options['processes'],
+            log=self.stdout.write,
+        )
+        # Как и при загрузке выгрузки: пакетные вставки не вызывают
+        # сигналы, поэтому статистика групп пересчитывается целиком,
+        # а тексты записей размечаются и индексируются отдельно.
+        reconcile_group_stats()
+        call_command('render_posts', missing=True, stdout=self.stdout)
@@ -0,0 +1,96 @@
+import re
+from html import escape
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+User = get_user_model()
+
+# Ссылки, упоминания и хэштеги не разбираются дальше, поэтому
+# «*» или «#» внутри адреса не превращаются в разметку.
+TOKEN_RE = re.compile(
+    r'`(?P<code>[^`\n]+)`'
+    r'|(?P<url>https?://[^\s<]*[^\s<.,:;!?)\]*])'
+    r'|(?<![\w@])@(?P<mention>[\w.+-]*\w)'
+    r'|(?<![\w&#])#(?P<tag>\w{1,50})'
+)
+# Внутри выделения звёздочек нет: поиск от каждого маркера идёт только
+# до следующей «*», и разбор строки остаётся линейным даже при
+# множестве незакрытых маркеров.
+BOLD_RE = re.compile(r'(?<!\w)\*\*(?=[^\s*])([^*]+?)(?<=\S)\*\*(?!\w)')
+ITALIC_RE = re.compile(
+    r'(?<![\w*])\*(?=[^\s*])([^*]+?)(?<=\S)\*(?![\w*])'
+)
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def _emphasis(text):
+    text = BOLD_RE.sub(r'<strong>\1</strong>', text)
+    return ITALIC_RE.sub(r'<em>\1</em>', text)
+
+
+def _token(match, usernames):
+    if match['code'] is not None:
+        return f'<code>{match["code"]}</code>'
+    if match['url'] is not None:
+        url = match['url']
+        return f'<a href="{url}" rel="nofollow noopener">{url}</a>'
+    if match['mention'] is not None:
+        name = match['mention']
+        if name not in usernames:
+            return match[0]
+        url = reverse('posts:profile', args=(name,))
+        return f'<a class="mention" href="{url}">@{name}</a>'
+    url = reverse('posts:tag', args=(match['tag'].lower(),))
+    return f'<a class="hashtag" href="{url}">#{match["tag"]}</a>'
+
+
+def _inline(line, usernames):
+    parts = []
+    position = 0
+    for match in TOKEN_RE.finditer(line):
+        parts.append(_emphasis(line[position:match.start()]))
+        parts.append(_token(match, usernames))
+        position = match.end()
+    parts.append(_emphasis(line[position:]))
+    return ''.join(parts)
+
+
+def mentioned_usernames(text):
+    return {
+        match['mention'] for match in TOKEN_RE.finditer(text)
+        if match['mention']
+    }
+
+
+def hashtags(text):
+    return {
+        match['tag'].lower() for match in TOKEN_RE.finditer(text)
+        if match['tag']
+    }
+
+
+def existing_usernames(names):
+    if not names:
+        return set()
+    return set(User.objects.filter(username__in=names).values_list(
+        'username', flat=True))
+
+
+def render_markup(text, usernames=None):
+    """Превращает текст записи в безопасный HTML.
+
+    Поддерживаются абзацы, переносы строк, **жирный**, *курсив*,
+    `код`, ссылки http(s), упоминания существующих пользователей и
+    хэштеги. Исходный текст экранируется целиком, поэтому HTML автора
+    не проходит в страницу ни в каком виде. ``usernames`` — заранее
+    найденные существующие имена, иначе они ищутся в базе.
+    """
+    escaped = escape(text.replace('\r\n', '\n').strip(), quote=True)
+    if usernames is None:
+        usernames = existing_usernames(mentioned_usernames(escaped))
+    paragraphs = []
+    for paragraph in PARAGRAPH_RE.split(escaped):
+        lines = [_inline(line, usernames) for line in paragraph.split('\n')]
+        paragraphs.append('<p>' + '<br>'.join(lines) + '</p>')
+    return '\n'.join(paragraphs)
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_trendingpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('comments_count', models.PositiveIntegerField(default=0)),
+                ('authors_count', models.PositiveIntegerField(default=0)),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='posts.Group')),
+            ],
+            options={
+                'verbose_name_plural': 'group stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupDailyStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('comments_count', models.PositiveIntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='posts.Group')),
+            ],
+            options={
+                'verbose_name_plural': 'group daily stats',
+                'ordering': ('-day',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='groupdailystats',
+            constraint=models.UniqueConstraint(fields=('group', 'day'), name='unique_group_day'),
+        ),
+    ]
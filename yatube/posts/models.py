@@ -1,6 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from core.identity import IdentityMapQuerySet
+from core.storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -8,7 +11,9 @@ class Post(models.Model):
     """Модель для управления записями проекта."""
 
     text = models.TextField()
-    pub_date = models.DateTimeField(auto_now_add=True)
+    text_html = models.TextField(blank=True, editable=False)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -24,9 +29,12 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
 
+    objects = IdentityMapQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
 
@@ -61,7 +69,9 @@ class Comment(models.Model):
         related_name='comments'
     )
     text = models.TextField('Текст', help_text='Текст нового комментария')
-    created = models.DateTimeField(auto_now_add=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = IdentityMapQuerySet.as_manager()
 
 
 class Follow(models.Model):
@@ -83,3 +93,167 @@ class Follow(models.Model):
                 name='unique_follow',
             )
         ]
+
+
+class Tag(models.Model):
+    """Хэштег из текста записей, хранится в нижнем регистре."""
+
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Обратный индекс: записи с данным тегом."""
+
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tag', 'post'],
+                name='unique_post_tag',
+            )
+        ]
+
+
+class Mention(models.Model):
+    """Упоминание пользователя в тексте записи."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_mention',
+            )
+        ]
+
+
+class PostRevision(models.Model):
+    """Версия текста записи: полный снимок или разница с предыдущей."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='revisions'
+    )
+    number = models.PositiveIntegerField()
+    snapshot = models.BooleanField(default=False)
+    data = models.TextField()
+    size = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('number',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'number'],
+                name='unique_post_revision',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} v{self.number}'
+
+
+class NewPostEvent(models.Model):
+    """Новая запись, о которой ещё не рассказали подписчикам автора."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class TrendingPost(models.Model):
+    """Предрассчитанный рейтинг популярных записей.
+
+    Строки с пустой группой образуют общую ленту, остальные — ленты групп.
+    Таблица целиком пересобирается командой ``rank_posts``.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='trending'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='trending'
+    )
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('rank',)
+        indexes = [
+            models.Index(fields=['group', 'rank']),
+        ]
+
+
+class GroupStats(models.Model):
+    """Накопленная статистика группы, обновляется сигналами."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    authors_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'group stats'
+
+    def __str__(self):
+        return f'{self.group}: {self.posts_count}'
+
+
+class GroupDailyStats(models.Model):
+    """Активность группы за день."""
+
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    day = models.DateField()
+    posts_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-day',)
+        verbose_name_plural = 'group daily stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'day'],
+                name='unique_group_day',
+            )
+        ]
@@ -0,0 +1,91 @@
+import heapq
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.decorators import invalidate_anonymous_pages
+
+from .models import Comment, Follow, Post, TrendingPost
+
+TRENDING_TOP = 50
+TRENDING_WINDOW = timedelta(days=7)
+# За это время вклад комментария или самого поста в рейтинг падает вдвое.
+HALF_LIFE_HOURS = 24
+FOLLOWERS_WEIGHT = 0.5
+
+
+def decay(age, half_life=HALF_LIFE_HOURS):
+    """Коэффициент затухания для события возрастом ``age``."""
+    hours = max(age.total_seconds(), 0) / 3600
+    return 0.5 ** (hours / half_life)
+
+
+def score_posts(now=None, window=TRENDING_WINDOW):
+    """Считает рейтинг записей, опубликованных за последнее окно.
+
+    Каждый свежий комментарий добавляет к рейтингу записи единицу,
+    затухающую со временем, а популярность автора добавляет логарифм
+    числа его подписчиков, затухающий с возрастом самой записи.
+    Возвращает словарь ``{post_id: (score, group_id)}``.
+    """
+    now = now or timezone.now()
+    since = now - window
+    posts = Post.objects.filter(pub_date__gte=since).values_list(
+        'id', 'author_id', 'group_id', 'pub_date'
+    )
+    followers = dict(
+        Follow.objects.values('author_id').annotate(
+            total=Count('id')
+        ).values_list('author_id', 'total')
+    )
+    comment_scores = defaultdict(float)
+    comments = Comment.objects.filter(
+        post__pub_date__gte=since, created__gte=since
+    ).values_list('post_id', 'created')
+    for post_id, created in comments.iterator():
+        comment_scores[post_id] += decay(now - created)
+    scores = {}
+    for post_id, author_id, group_id, pub_date in posts.iterator():
+        popularity = FOLLOWERS_WEIGHT * math.log1p(
+            followers.get(author_id, 0)
+        )
+        score = comment_scores[post_id] + popularity * decay(now - pub_date)
+        scores[post_id] = (score, group_id)
+    return scores
+
+
+def rebuild_trending(top=TRENDING_TOP, now=None):
+    """Пересобирает таблицу популярных записей: общую и по группам."""
+    scores = score_posts(now=now)
+    feeds = defaultdict(list)
+    for post_id, (score, group_id) in scores.items():
+        feeds[None].append((score, post_id))
+        if group_id is not None:
+            feeds[group_id].append((score, post_id))
+    rows = []
+    for group_id, candidates in feeds.items():
+        best = heapq.nlargest(top, candidates)
+        rows.extend(
+            TrendingPost(
+                post_id=post_id, group_id=group_id, rank=rank, score=score
+            )
+            for rank, (score, post_id) in enumerate(best, start=1)
+        )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(rows)
+    invalidate_anonymous_pages()
+    return len(rows)
+
+
+def trending_posts(group=None):
+    """Записи ленты популярного в порядке рейтинга."""
+    return [
+        row.post for row in TrendingPost.objects.filter(
+            group=group
+        ).select_related('post__author', 'post__group')
+    ]
@@ -0,0 +1,141 @@
+"""История правок записей.
+
+Первая версия и каждая SNAPSHOT_INTERVAL-я хранятся целиком, остальные —
+разницей с предыдущей версией. Разница — JSON-список операций над
+старым текстом: положительное число копирует столько символов,
+отрицательное пропускает, строка вставляется как есть. Чтобы получить
+версию, берётся ближайший снимок и к нему по порядку применяются
+разницы, то есть читается не больше SNAPSHOT_INTERVAL строк.
+
+Записи без правок истории не имеют: исходный текст сохраняется первым
+снимком только при первой правке.
+"""
+import json
+import os
+from difflib import SequenceMatcher
+
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Length
+
+from .models import PostRevision
+
+SNAPSHOT_INTERVAL = 10
+# Посимвольное сравнение квадратично, поэтому оно применяется только к
+# изменившейся середине текста не длиннее этого числа символов; более
+# длинная середина записывается заменой целиком.
+DIFF_MAX_LENGTH = 1000
+
+
+def _common_prefix(first, second):
+    return len(os.path.commonprefix([first, second]))
+
+
+def _diff_ops(old, new):
+    if len(old) > DIFF_MAX_LENGTH or len(new) > DIFF_MAX_LENGTH:
+        return [-len(old), new]
+    ops = []
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(new[j1:j2])
+    return ops
+
+
+def make_delta(old, new):
+    """Разница двух текстов за время, линейное по их длине.
+
+    Совпадающие начало и конец отсекаются сразу, подробно сравнивается
+    только середина между ними.
+    """
+    prefix = _common_prefix(old, new)
+    suffix = _common_prefix(old[prefix:][::-1], new[prefix:][::-1])
+    ops = [prefix]
+    ops += _diff_ops(
+        old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+    )
+    ops.append(suffix)
+    ops = [op for op in ops if op not in (0, '')]
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(old, delta):
+    parts = []
+    position = 0
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.append(old[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+
+def record_revision(post, old_text):
+    """Сохраняет новый текст записи версией после old_text."""
+    last = post.revisions.aggregate(number=Max('number'))['number']
+    if last is None:
+        PostRevision.objects.create(
+            post=post, number=1, snapshot=True, data=old_text,
+            size=len(old_text),
+        )
+        last = 1
+    number = last + 1
+    data = make_delta(old_text, post.text)
+    snapshot = (
+        (number - 1) % SNAPSHOT_INTERVAL == 0
+        or len(data) >= len(post.text)
+    )
+    return PostRevision.objects.create(
+        post=post, number=number, snapshot=snapshot,
+        data=post.text if snapshot else data, size=len(post.text),
+    )
+
+
+def _replay(revisions):
+    text = ''
+    for revision in revisions:
+        if revision.snapshot:
+            text = revision.data
+        else:
+            text = apply_delta(text, revision.data)
+        yield revision, text
+
+
+def text_at(post, number):
+    """Текст записи в версии number; None, если такой версии нет."""
+    revisions = post.revisions.filter(number__lte=number)
+    start = revisions.filter(snapshot=True).aggregate(
+        number=Max('number'))['number']
+    if start is None:
+        return None
+    for revision, text in _replay(revisions.filter(number__gte=start)):
+        if revision.number == number:
+            return text
+    return None
+
+
+def versions(post):
+    """Все версии записи от первой к последней: пары (версия, текст)."""
+    return list(_replay(post.revisions.all()))
+
+
+def storage_stats():
+    """Сколько места занимает история и сколько заняли бы полные копии."""
+    stats = PostRevision.objects.aggregate(
+        revisions=Count('id'),
+        snapshots=Count('id', filter=Q(snapshot=True)),
+        posts=Count('post', distinct=True),
+        stored=Sum(Length('data')),
+        full=Sum('size'),
+    )
+    stats['stored'] = stats['stored'] or 0
+    stats['full'] = stats['full'] or 0
+    stats['ratio'] = stats['stored'] / stats['full'] if stats['full'] else 0
+    return stats
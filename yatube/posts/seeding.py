@@ -0,0 +1,234 @@
+import io
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from .images import recount_image_references
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+# Чем меньше показатель, тем сильнее активность сосредоточена у немногих.
+ACTIVITY_SHAPE = 1.2
+WORDS = (
+    'привет мир пост группа новости фото лето город кот код погода '
+    'книга музыка кино спорт путешествие вечер утро друзья работа'
+).split()
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _weights(rng, size):
+    """Степенное распределение активности между ``size`` участниками."""
+    return [rng.paretovariate(ACTIVITY_SHAPE) for _ in range(size)]
+
+
+def _chunks(total, size=BATCH_SIZE):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+def _post_rows(args):
+    """Генерирует порцию записей; выполняется в отдельном процессе."""
+    seed, count, authors, weights, groups, images = args
+    rng = random.Random(seed)
+    picked = rng.choices(authors, weights=weights, k=count)
+    return [
+        (
+            author_id,
+            rng.choice(groups) if groups and rng.random() < 0.7 else None,
+            _text(rng, rng.randint(5, 60)),
+            rng.choice(images) if images and rng.random() < 0.3 else '',
+        )
+        for author_id in picked
+    ]
+
+
+def _comment_rows(args):
+    """Генерирует порцию комментариев; выполняется в отдельном процессе."""
+    seed, count, posts, post_weights, users, user_weights = args
+    rng = random.Random(seed)
+    return list(zip(
+        rng.choices(posts, weights=post_weights, k=count),
+        rng.choices(users, weights=user_weights, k=count),
+        (_text(rng, rng.randint(3, 20)) for _ in range(count)),
+    ))
+
+
+def _follow_rows(args):
+    """Генерирует порцию подписок; выполняется в отдельном процессе."""
+    seed, count, users, weights = args
+    rng = random.Random(seed)
+    pairs = set()
+    for user_id, author_id in zip(
+        rng.choices(users, k=count),
+        rng.choices(users, weights=weights, k=count),
+    ):
+        if user_id != author_id:
+            pairs.add((user_id, author_id))
+    return sorted(pairs)
+
+
+def _make_images(rng, count, prefix):
+    """Создаёт картинки разного размера."""
+    names = []
+    for number in range(count):
+        image = Image.new('RGB', (rng.randint(200, 1600), rng.randint(
+            200, 1200)), tuple(rng.randrange(256) for _ in range(3)))
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=80)
+        names.append(Post._meta.get_field('image').storage.save(
+            f'posts/{prefix}_{number}.jpg', ContentFile(buffer.getvalue())
+        ))
+    return names
+
+
+def _bulk(model, objects):
+    with transaction.atomic():
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+
+
+def seed_scale(users, groups, posts, comments, follows, images=0,
+               days=365, seed=0, processes=None, log=print):
+    """Заполняет базу синтетическими данными заданного объёма.
+
+    Данные генерируются порциями в пуле процессов и детерминированы
+    ``seed``: одинаковые параметры дают одинаковое содержимое.
+    Запись идёт из основного процесса пакетными вставками.
+    """
+    rng = random.Random(seed)
+    prefix = f'seed{seed}'
+    password = make_password(None)
+    for start, size in _chunks(users):
+        _bulk(User, [
+            User(username=f'{prefix}_user{number}', password=password)
+            for number in range(start, start + size)
+        ])
+    user_ids = list(User.objects.filter(
+        username__startswith=f'{prefix}_user'
+    ).order_by('id').values_list('id', flat=True))
+    log(f'Пользователей: {len(user_ids)}')
+
+    _bulk(Group, [
+        Group(
+            title=f'Группа {number}',
+            slug=f'{prefix}-group-{number}',
+            description=_text(rng, 12),
+        )
+        for number in range(groups)
+    ])
+    group_ids = list(Group.objects.filter(
+        slug__startswith=f'{prefix}-group-'
+    ).order_by('id').values_list('id', flat=True))
+    log(f'Групп: {len(group_ids)}')
+
+    image_names = _make_images(rng, images, prefix)
+    user_weights = _weights(rng, len(user_ids))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        tasks = [
+            (seed * 1000003 + index, size, user_ids, user_weights,
+             group_ids, image_names)
+            for index, (_, size) in enumerate(_chunks(posts))
+        ]
+        for rows in pool.map(_post_rows, tasks):
+            _bulk(Post, [
+                Post(author_id=author_id, group_id=group_id, text=text,
+                     image=image)
+                for author_id, group_id, text, image in rows
+            ])
+        seeded_posts = Post.objects.filter(
+            author__username__startswith=f'{prefix}_user'
+        )
+        _spread_dates(rng, seeded_posts, days)
+        recount_image_references()
+        log(f'Записей: {posts}')
+
+        post_ids = list(seeded_posts.order_by('id').values_list(
+            'id', flat=True))
+        post_weights = _weights(rng, len(post_ids))
+        tasks = [
+            (seed * 2000003 + index, size, post_ids, post_weights,
+             user_ids, user_weights)
+            for index, (_, size) in enumerate(_chunks(comments))
+        ]
+        for rows in pool.map(_comment_rows, tasks):
+            _bulk(Comment, [
+                Comment(post_id=post_id, author_id=author_id, text=text)
+                for post_id, author_id, text in rows
+            ])
+        _spread_comment_dates(rng, Comment.objects.filter(
+            post__author__username__startswith=f'{prefix}_user'
+        ))
+        log(f'Комментариев: {comments}')
+
+        tasks = [
+            (seed * 3000003 + index, size, user_ids, user_weights)
+            for index, (_, size) in enumerate(_chunks(follows))
+        ]
+        for rows in pool.map(_follow_rows, tasks):
+            _bulk(Follow, [
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id, author_id in rows
+            ])
+        total = Follow.objects.filter(
+            user__username__startswith=f'{prefix}_user'
+        ).count()
+        log(f'Подписок: {total}')
+
+
+def _spread_dates(rng, posts, days):
+    """Раскладывает даты записей по последним ``days`` дням.
+
+    ``auto_now_add`` проставляет всем вставленным записям текущее время,
+    поэтому даты обновляются отдельно: порядок id совпадает с порядком
+    публикации, а разброс внутри шага случаен.
+    """
+    total = posts.count()
+    if not total:
+        return
+    start = timezone.now() - timedelta(days=days)
+    step = timedelta(days=days) / total
+    number, last_id = 0, 0
+    while True:
+        batch = list(posts.filter(id__gt=last_id).order_by('id').only(
+            'id')[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.pub_date = start + step * (number + rng.random())
+            number += 1
+        Post.objects.bulk_update(batch, ['pub_date'])
+        last_id = batch[-1].id
+
+
+def _spread_comment_dates(rng, comments):
+    """Ставит комментариям даты между публикацией записи и текущим моментом.
+
+    Как и у записей, ``auto_now_add`` дал всем одно время вставки.
+    Большая часть комментариев появляется вскоре после записи: доля
+    прошедшего с публикации времени берётся в квадрате.
+    """
+    now = timezone.now()
+    last_id = 0
+    while True:
+        batch = list(comments.filter(id__gt=last_id).order_by(
+            'id').values_list('id', 'post__pub_date')[:BATCH_SIZE])
+        if not batch:
+            break
+        Comment.objects.bulk_update([
+            Comment(id=comment_id, created=(
+                pub_date + (now - pub_date) * rng.random() ** 2
+            ))
+            for comment_id, pub_date in batch
+        ], ['created'])
+        last_id = batch[-1][0]
@@ -0,0 +1,208 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core.auth import is_login_stamp
+from core.decorators import invalidate_anonymous_pages
+from core.identity import forget
+from core.storage import acquire, release
+
+from . import stats
+from .digests import record_new_post
+from .lookups import invalidate_author, invalidate_group
+from .markup import render_markup
+from .revisions import record_revision
+from .tags import index_post
+from .models import Comment, Group, Post
+from .utils import invalidate_author_posts_count, invalidate_post_detail
+
+User = get_user_model()
+
+
+def _group_neighbours(post, group_id):
+    """Соседние посты группы, у которых меняются ссылки «назад/вперёд»."""
+    if group_id is None:
+        return []
+    group_posts = Post.objects.filter(group_id=group_id)
+    return [
+        group_posts.filter(pub_date__lt=post.pub_date).order_by(
+            '-pub_date').values_list('id', flat=True).first(),
+        group_posts.filter(pub_date__gt=post.pub_date).order_by(
+            'pub_date').values_list('id', flat=True).first(),
+    ]
+
+
+def _post_group_id(post_id):
+    return Post.objects.filter(id=post_id).values_list(
+        'group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    # При переносе записи меняются ссылки и у соседей в прежней группе.
+    group_ids = {
+        instance.group_id, getattr(instance, '_stats_group_id', None)
+    }
+    invalidate_post_detail(instance.id, *(
+        post_id for group_id in group_ids
+        for post_id in _group_neighbours(instance, group_id)
+    ))
+    invalidate_author_posts_count(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    invalidate_post_detail(instance.post_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    state = None
+    if instance.id:
+        state = Post.objects.filter(id=instance.id).values_list(
+            'group_id', 'image', 'text').first()
+    (
+        instance._stats_group_id, instance._stored_image,
+        instance._stored_text,
+    ) = state or (None, '', None)
+    # Новый файл сохранит хранилище, и ссылку на него оно возьмёт само.
+    instance._image_acquired = bool(instance.image) and not getattr(
+        instance.image, '_committed', True
+    )
+
+
+@receiver(pre_save, sender=Post)
+def render_post_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.text_html = render_markup(instance.text)
+
+
+@receiver(post_save, sender=Post)
+def index_post_text(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_stored_text', None) != instance.text:
+        index_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def remember_revision(sender, instance, created, raw=False, **kwargs):
+    old_text = getattr(instance, '_stored_text', None)
+    if not (created or raw or old_text is None) and (
+        old_text != instance.text
+    ):
+        record_revision(instance, old_text)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    old_group_id = getattr(instance, '_stats_group_id', None)
+    if created:
+        stats.add_post(instance, instance.group_id)
+    elif old_group_id != instance.group_id:
+        comments = stats.move_daily_comments(
+            instance, old_group_id, instance.group_id
+        )
+        stats.remove_post(instance, old_group_id, comments)
+        stats.add_post(instance, instance.group_id, comments)
+
+
+@receiver(pre_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    stats.remove_post(instance, instance.group_id, authors=False)
+
+
+@receiver(post_delete, sender=Post)
+def recount_group_authors(sender, instance, **kwargs):
+    stats.recount_authors(instance.group_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created and instance.post_id is not None:
+        stats.change_comments(
+            _post_group_id(instance.post_id), instance.created, 1
+        )
+
+
+# Удаление считается до выполнения запроса: при каскадном удалении
+# записи порядок удаления записи и комментариев не определён.
+@receiver(pre_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        stats.change_comments(
+            _post_group_id(instance.post_id), instance.created, -1
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, **kwargs):
+    old_image = getattr(instance, '_stored_image', '')
+    acquired = getattr(instance, '_image_acquired', False)
+    if instance.image.name != old_image:
+        if not acquired:
+            acquire(instance.image.name)
+        release(old_image, instance.image.storage)
+    elif acquired:
+        # Загружен тот же файл: ссылка, взятая при сохранении, лишняя.
+        release(instance.image.name, instance.image.storage)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    release(instance.image.name, instance.image.storage)
+
+
+@receiver(post_save, sender=Post)
+def notify_followers(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_new_post(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_pages(sender, **kwargs):
+    invalidate_anonymous_pages()
+
+
+@receiver(pre_save, sender=User)
+def forget_renamed_author(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (
+        update_fields and 'username' not in update_fields
+    ):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True).first()
+    if old is not None and old != instance.username:
+        invalidate_author(old)
+
+
+@receiver(pre_save, sender=Group)
+def forget_moved_group(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    old = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True).first()
+    if old is not None and old != instance.slug:
+        invalidate_group(old)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_author(sender, instance, update_fields=None, **kwargs):
+    if is_login_stamp(update_fields):
+        return
+    invalidate_author(instance.username)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_group(sender, instance, **kwargs):
+    invalidate_group(instance.slug)
+    forget(instance)
@@ -0,0 +1,175 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Comment, GroupDailyStats, GroupStats, Post
+
+STATS_DAYS = 7
+
+
+def _bump(model, lookup, **deltas):
+    """Атомарно сдвигает счётчики строки статистики, создавая её при нужде."""
+    model.objects.get_or_create(**lookup)
+    model.objects.filter(**lookup).update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items() if delta
+    })
+
+
+def _day(moment):
+    return timezone.localtime(moment).date()
+
+
+def _author_has_other_posts(post, group_id):
+    return Post.objects.filter(
+        group_id=group_id, author_id=post.author_id
+    ).exclude(id=post.id).exists()
+
+
+def add_post(post, group_id, comments=0):
+    """Учитывает появление записи (и её комментариев) в группе."""
+    if group_id is None:
+        return
+    new_author = not _author_has_other_posts(post, group_id)
+    _bump(
+        GroupStats, {'group_id': group_id},
+        posts_count=1, comments_count=comments, authors_count=int(new_author)
+    )
+    _bump(
+        GroupDailyStats, {'group_id': group_id, 'day': _day(post.pub_date)},
+        posts_count=1,
+    )
+
+
+def remove_post(post, group_id, comments=0, authors=True):
+    """Учитывает уход записи (и её комментариев) из группы.
+
+    При удалении ``authors=False``: каскад вызывает ``pre_delete`` для всех
+    записей автора до удаления строк, и проверка «остались ли у автора
+    другие записи» всегда истинна. Число авторов в этом случае
+    пересчитывает ``recount_authors`` после удаления.
+    """
+    if group_id is None:
+        return
+    last_post = authors and not _author_has_other_posts(post, group_id)
+    _bump(
+        GroupStats, {'group_id': group_id},
+        posts_count=-1, comments_count=-comments,
+        authors_count=-int(last_post)
+    )
+    _bump(
+        GroupDailyStats, {'group_id': group_id, 'day': _day(post.pub_date)},
+        posts_count=-1,
+    )
+
+
+def recount_authors(group_id):
+    """Пересчитывает число авторов группы по оставшимся записям."""
+    if group_id is None:
+        return
+    authors = Post.objects.filter(group_id=group_id).order_by().values(
+        'author_id').distinct().count()
+    GroupStats.objects.filter(group_id=group_id).update(
+        authors_count=authors
+    )
+
+
+def move_daily_comments(post, old_group_id, new_group_id):
+    """Переносит дневные счётчики комментариев записи в новую группу.
+
+    Возвращает общее число комментариев записи.
+    """
+    by_day = post.comments.order_by().annotate(
+        day=TruncDate('created')
+    ).values('day').annotate(total=Count('id'))
+    comments = 0
+    for row in by_day:
+        comments += row['total']
+        for group_id, sign in ((old_group_id, -1), (new_group_id, 1)):
+            if group_id is not None:
+                _bump(
+                    GroupDailyStats, {'group_id': group_id, 'day': row['day']},
+                    comments_count=sign * row['total'],
+                )
+    return comments
+
+
+def change_comments(group_id, created, delta):
+    """Учитывает добавление или удаление комментария в группе."""
+    if group_id is None:
+        return
+    _bump(GroupStats, {'group_id': group_id}, comments_count=delta)
+    _bump(
+        GroupDailyStats, {'group_id': group_id, 'day': _day(created)},
+        comments_count=delta,
+    )
+
+
+def group_summary(group):
+    """Статистика для страницы группы: итоги и активность за неделю."""
+    stats = GroupStats.objects.filter(group=group).first()
+    since = timezone.localdate() - timedelta(days=STATS_DAYS - 1)
+    recent = GroupDailyStats.objects.filter(
+        group=group, day__gte=since
+    ).aggregate(posts=Sum('posts_count'), comments=Sum('comments_count'))
+    return {
+        'posts': stats.posts_count if stats else 0,
+        'comments': stats.comments_count if stats else 0,
+        'authors': stats.authors_count if stats else 0,
+        'recent_posts': recent['posts'] or 0,
+        'recent_comments': recent['comments'] or 0,
+    }
+
+
+def reconcile_group_stats():
+    """Пересчитывает всю статистику групп по исходным таблицам."""
+    totals = {}
+    posts = Post.objects.exclude(group=None).order_by().values(
+        'group_id'
+    ).annotate(
+        posts=Count('id'), authors=Count('author_id', distinct=True)
+    )
+    for row in posts:
+        totals[row['group_id']] = GroupStats(
+            group_id=row['group_id'],
+            posts_count=row['posts'],
+            authors_count=row['authors'],
+        )
+    comments = Comment.objects.exclude(post__group=None).values(
+        'post__group_id'
+    ).annotate(comments=Count('id'))
+    for row in comments:
+        stats = totals.setdefault(
+            row['post__group_id'],
+            GroupStats(group_id=row['post__group_id'])
+        )
+        stats.comments_count = row['comments']
+
+    daily = {}
+    posts_by_day = Post.objects.exclude(group=None).order_by().annotate(
+        day=TruncDate('pub_date')
+    ).values('group_id', 'day').annotate(total=Count('id'))
+    for row in posts_by_day:
+        key = (row['group_id'], row['day'])
+        daily[key] = GroupDailyStats(
+            group_id=key[0], day=key[1], posts_count=row['total']
+        )
+    comments_by_day = Comment.objects.exclude(post__group=None).annotate(
+        day=TruncDate('created')
+    ).values('post__group_id', 'day').annotate(total=Count('id'))
+    for row in comments_by_day:
+        key = (row['post__group_id'], row['day'])
+        stats = daily.setdefault(
+            key, GroupDailyStats(group_id=key[0], day=key[1])
+        )
+        stats.comments_count = row['total']
+
+    with transaction.atomic():
+        GroupStats.objects.all().delete()
+        GroupStats.objects.bulk_create(totals.values())
+        GroupDailyStats.objects.all().delete()
+        GroupDailyStats.objects.bulk_create(daily.values())
+    return len(totals), len(daily)
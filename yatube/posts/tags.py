@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+
+from .markup import hashtags, mentioned_usernames
+from .models import Mention, PostTag, Tag
+
+User = get_user_model()
+
+
+def _sync(rows, current, wanted, create):
+    """Приводит строки индекса к нужному набору, не трогая совпадающие."""
+    stale = [pk for name, pk in current.items() if name not in wanted]
+    if stale:
+        rows.filter(id__in=stale).delete()
+    new = wanted - current.keys()
+    if new:
+        create(new)
+
+
+def sync_tags(post, names):
+    def create(new):
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in new], ignore_conflicts=True
+        )
+        PostTag.objects.bulk_create(
+            [PostTag(tag=tag, post=post)
+             for tag in Tag.objects.filter(name__in=new)],
+            ignore_conflicts=True,
+        )
+
+    rows = PostTag.objects.filter(post=post)
+    _sync(rows, dict(rows.values_list('tag__name', 'id')), names, create)
+
+
+def sync_mentions(post, usernames):
+    def create(new):
+        Mention.objects.bulk_create(
+            [Mention(user=user, post=post)
+             for user in User.objects.filter(username__in=new)],
+            ignore_conflicts=True,
+        )
+
+    rows = Mention.objects.filter(post=post)
+    _sync(
+        rows, dict(rows.values_list('user__username', 'id')), usernames,
+        create
+    )
+
+
+def index_post(post):
+    """Обновляет теги и упоминания записи по её тексту."""
+    sync_tags(post, hashtags(post.text))
+    sync_mentions(post, mentioned_usernames(post.text))
@@ -0,0 +1,79 @@
+from functools import lru_cache
+from hashlib import md5
+
+from django import template
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from core.twolevel import TwoLevelCache
+
+register = template.Library()
+
+POST_CARD_CACHE_KEY = 'post_card:{}:{}:{}:{:d}'
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Ключ карточки меняется вместе с записью, поэтому сбрасывать L1 не нужно.
+card_cache = TwoLevelCache('post_cards', maxsize=1024, ttl=60 * 5)
+
+
+def card_cache_key(post, show_author):
+    """Ключ карточки меняется при любом сохранении записи.
+
+    В карточку попадают имя автора, адреса профиля и группы и размеченный
+    текст, поэтому хэш от них тоже входит в ключ: переименование
+    пользователя, смена адреса группы или новая разметка текста
+    (``render_posts`` не меняет ``updated``) не оставят в кеше устаревших
+    карточек.
+    """
+    shown = [post.text_html, post.group.slug if post.group_id else '']
+    if show_author:
+        shown += [post.author.username, post.author.get_full_name()]
+    return POST_CARD_CACHE_KEY.format(
+        post.id, post.updated.timestamp(),
+        md5('\n'.join(shown).encode()).hexdigest(), show_author
+    )
+
+
+@lru_cache(maxsize=None)
+def card_template():
+    """Шаблон карточки компилируется один раз на процесс."""
+    return get_template('posts/includes/post_card.html')
+
+
+def render_card(post, show_author):
+    """Отрисовывает карточку, ссылки вычисляются заранее в коде."""
+    context = {
+        'post': post,
+        'show_author': show_author,
+        'detail_url': reverse('posts:post_detail', args=(post.id,)),
+        'profile_url': (
+            reverse('posts:profile', args=(post.author.username,))
+            if show_author else None
+        ),
+        'group_url': (
+            reverse('posts:group_posts', args=(post.group.slug,))
+            if post.group_id else None
+        ),
+    }
+    return card_template().render(context)
+
+
+@register.simple_tag
+def post_cards(posts, show_author=True):
+    """
+    Готовые карточки записей страницы.
+
+    Карточки берутся из памяти процесса или из общего кеша одним
+    запросом, отрисовываются только промахи.
+    """
+    keys = {card_cache_key(post, show_author): post for post in posts}
+    cards = card_cache.get_many(keys)
+    missing = {
+        key: render_card(post, show_author)
+        for key, post in keys.items() if key not in cards
+    }
+    if missing:
+        card_cache.set_many(missing, POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
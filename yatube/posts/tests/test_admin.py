@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..admin import EstimatedCountPaginator
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.admin, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.admin, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def test_changelists_available(self):
+        """Списки записей, комментариев и подписок открываются в админке."""
+        for model in ('post', 'comment', 'follow'):
+            with self.subTest(model=model):
+                response = self.admin_client.get(
+                    reverse(f'admin:posts_{model}_changelist')
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_group_select_not_rendered_for_each_row(self):
+        """Редактируемая группа в списке не выводит все группы сразу."""
+        Group.objects.create(
+            title='Лишняя группа', slug='extra', description='Описание'
+        )
+        response = self.admin_client.get(
+            reverse('admin:posts_post_changelist')
+        )
+        self.assertNotContains(response, 'Лишняя группа')
+
+    def test_estimated_count_is_cached(self):
+        """Число строк для паджинатора берётся из кэша."""
+        self.assertEqual(
+            EstimatedCountPaginator(Post.objects.all(), 10).count, 1
+        )
+        Post.objects.create(author=self.user, text='Ещё один пост')
+        with self.assertNumQueries(0):
+            count = EstimatedCountPaginator(Post.objects.all(), 10).count
+        self.assertEqual(count, 1)
@@ -0,0 +1,85 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Group, Post
+from ..templatetags import post_cards
+
+User = get_user_model()
+
+
+class PostCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, show_author=True):
+        post = Post.objects.select_related('author', 'group').get(
+            id=self.post.id
+        )
+        return post_cards.post_cards([post], show_author)
+
+    def test_card_rendered_once(self):
+        """Повторный вывод карточки берётся из кеша без отрисовки."""
+        first = self.render()
+        with mock.patch.object(
+            post_cards, 'render_card', wraps=post_cards.render_card
+        ) as render_card:
+            second = self.render()
+        render_card.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertIn('/profile/auth/', first[0])
+        self.assertIn('/group/test-slug/', first[0])
+
+    def test_card_follows_edit(self):
+        """После правки записи карточка отрисовывается заново."""
+        self.render()
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        self.assertIn('Исправленный текст', self.render()[0])
+
+    def test_card_follows_author_and_group_renames(self):
+        """Смена имени автора и адреса группы меняет ссылки карточки."""
+        self.render()
+        User.objects.filter(id=self.user.id).update(username='renamed')
+        Group.objects.filter(id=self.group.id).update(slug='new-slug')
+        card = self.render()[0]
+        self.assertIn('/profile/renamed/', card)
+        self.assertIn('/group/new-slug/', card)
+        self.assertNotIn('/profile/auth/', card)
+
+    def test_card_follows_rerendered_markup(self):
+        """Перерисовка текста без смены updated обновляет карточку."""
+        self.render()
+        Post.objects.filter(id=self.post.id).update(
+            text_html='<p><strong>Тестовый</strong> пост</p>'
+        )
+        self.assertIn('<strong>Тестовый</strong>', self.render()[0])
+
+    def test_card_without_author(self):
+        """В профиле карточка выводится без ссылки на автора."""
+        card = self.render(show_author=False)[0]
+        self.assertNotIn('/profile/auth/', card)
+        self.assertIn('Тестовый пост', card)
+
+    def test_benchmark_command(self):
+        """Команда замера выводит время для всех вариантов отрисовки."""
+        out = StringIO()
+        call_command('bench_post_cards', repeat=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
@@ -0,0 +1,133 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import run_pending
+
+from ..digests import send_digests
+from ..models import Follow, NewPostEvent, Post
+
+User = get_user_model()
+
+
+class FollowerDigestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other_author = User.objects.create_user(username='other')
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com'
+        )
+        cls.second_reader = User.objects.create_user(
+            username='second', email='second@example.com'
+        )
+        cls.no_email = User.objects.create_user(username='silent')
+        for user in (cls.reader, cls.no_email):
+            Follow.objects.create(user=user, author=cls.author)
+            Follow.objects.create(user=user, author=cls.other_author)
+        Follow.objects.create(user=cls.second_reader, author=cls.author)
+
+    def test_new_posts_queue_single_digest(self):
+        """Новые записи копятся, рассылка планируется одна на окно."""
+        Post.objects.create(author=self.author, text='Первая')
+        Post.objects.create(author=self.other_author, text='Вторая')
+        self.assertEqual(NewPostEvent.objects.count(), 2)
+        self.assertEqual(
+            Task.objects.filter(key='follower_digest').count(), 1
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_one_email_per_follower(self):
+        """Каждый подписчик получает одно письмо обо всех записях."""
+        Post.objects.create(author=self.author, text='Первая')
+        Post.objects.create(author=self.other_author, text='Вторая')
+        self.assertEqual(send_digests(), 2)
+        letters = {letter.to[0]: letter.body for letter in mail.outbox}
+        self.assertEqual(
+            set(letters), {'reader@example.com', 'second@example.com'}
+        )
+        self.assertIn('Первая', letters['reader@example.com'])
+        self.assertIn('Вторая', letters['reader@example.com'])
+        self.assertNotIn('Вторая', letters['second@example.com'])
+        self.assertFalse(NewPostEvent.objects.exists())
+        self.assertEqual(send_digests(), 0)
+
+    def test_messages_sent_in_batches_over_one_connection(self):
+        """Письма уходят пачками через одно соединение."""
+        Post.objects.create(author=self.author, text='Первая')
+        with mock.patch('posts.digests.SEND_BATCH', 1), mock.patch(
+            'posts.digests.get_connection',
+            wraps=mail.get_connection,
+        ) as get_connection:
+            send_digests()
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_retry_skips_delivered_batches(self):
+        """Повтор после сбоя не шлёт писем тем, кто их уже получил."""
+        Post.objects.create(author=self.author, text='Первая')
+        Task.objects.update(run_at=timezone.now())
+        send_messages = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def flaky(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise ConnectionError('SMTP недоступен')
+            return send_messages(connection, messages)
+
+        with mock.patch('posts.digests.SEND_BATCH', 1), mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            flaky,
+        ):
+            run_pending()
+            self.assertEqual(len(mail.outbox), 1)
+            self.assertTrue(NewPostEvent.objects.exists())
+            Task.objects.update(run_at=timezone.now())
+            run_pending()
+        self.assertEqual(
+            sorted(letter.to[0] for letter in mail.outbox),
+            ['reader@example.com', 'second@example.com']
+        )
+        self.assertFalse(NewPostEvent.objects.exists())
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_retry_progress_survives_new_pending_digest(self):
+        """Прогресс сбойной рассылки переходит к уже поставленной новой."""
+        Post.objects.create(author=self.author, text='Первая')
+        Task.objects.update(run_at=timezone.now())
+        send_messages = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def flaky(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                # Во время рассылки появилась новая запись.
+                Post.objects.create(author=self.author, text='Вторая')
+                raise ConnectionError('SMTP недоступен')
+            return send_messages(connection, messages)
+
+        with mock.patch('posts.digests.SEND_BATCH', 1), mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            flaky,
+        ):
+            run_pending()
+            for _ in range(2):
+                Task.objects.filter(status=Task.PENDING).update(
+                    run_at=timezone.now()
+                )
+                run_pending()
+        first = sorted(
+            letter.to[0] for letter in mail.outbox if 'Первая' in letter.body
+        )
+        second = sorted(
+            letter.to[0] for letter in mail.outbox if 'Вторая' in letter.body
+        )
+        self.assertEqual(first, ['reader@example.com', 'second@example.com'])
+        self.assertEqual(second, ['reader@example.com', 'second@example.com'])
+        self.assertFalse(NewPostEvent.objects.exists())
@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from core.storage import ContentAddressedStorage
 from posts.forms import PostForm
 from posts.models import Comment, Group, Post
 
@@ -76,7 +77,10 @@ class PostFormsTests(TestCase):
         new_post = Post.objects.get(id=2)
         self.assertEqual(new_post.text, form_data['text'])
         self.assertEqual(new_post.group.title, self.group.title)
-        self.assertEqual(new_post.image, 'posts/small.gif')
+        self.assertEqual(
+            new_post.image,
+            ContentAddressedStorage.hashed_name('posts/small.gif', uploaded)
+        )
 
     def test_post_edit(self):
         """Валидная форма редактирует существующий пост."""
@@ -0,0 +1,112 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.models import MediaBlob, Task
+from core.tasks import run_pending
+
+from ..forms import PostForm
+from ..images import process_post_image
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(size, image_format='PNG', mode='RGB', exif=None):
+    buffer = io.BytesIO()
+    params = {'exif': exif} if exif else {}
+    Image.new(mode, size, 'red').save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageIngestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_form_rejects_oversized_upload(self):
+        """Форма не принимает слишком тяжёлые и слишком большие картинки."""
+        content = make_image((300, 200))
+        with mock.patch('posts.images.MAX_UPLOAD_SIZE', len(content) - 1):
+            form = PostForm(
+                {'text': 'Текст'},
+                {'image': SimpleUploadedFile('big.png', content)},
+            )
+            self.assertFalse(form.is_valid())
+        with mock.patch('posts.images.MAX_UPLOAD_SIDE', 299):
+            form = PostForm(
+                {'text': 'Текст'},
+                {'image': SimpleUploadedFile('wide.png', content)},
+            )
+            self.assertFalse(form.is_valid())
+        form = PostForm(
+            {'text': 'Текст'},
+            {'image': SimpleUploadedFile('ok.png', content)},
+        )
+        self.assertTrue(form.is_valid())
+
+    def test_post_create_queues_processing(self):
+        """Перекодирование новой картинки выполняет фоновая очередь."""
+        client = Client()
+        client.force_login(self.user)
+        client.post(reverse('posts:post_create'), {
+            'text': 'С картинкой',
+            'image': SimpleUploadedFile('new.png', make_image((300, 200))),
+        })
+        post = Post.objects.get(text='С картинкой')
+        self.assertTrue(post.image.name.endswith('.png'))
+        self.assertTrue(
+            Task.objects.filter(key=f'post_image:{post.id}').exists()
+        )
+        run_pending()
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith('.jpg'))
+
+    def test_process_post_image_reencodes_and_caps_size(self):
+        """Картинка перекодируется в JPEG, уменьшается и теряет EXIF."""
+        exif = Image.Exif()
+        exif[0x010f] = 'Camera'
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(
+                'photo.jpg', make_image((4000, 1000), 'JPEG', exif=exif)
+            ),
+        )
+        old_name = post.image.name
+        process_post_image(post.id)
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        self.assertFalse(MediaBlob.objects.filter(name=old_name).exists())
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (1920, 480))
+            self.assertNotIn('exif', image.info)
+
+    def test_process_post_image_keeps_transparency(self):
+        """Картинка с прозрачностью сохраняется в PNG."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(
+                'logo.png', make_image((100, 100), mode='RGBA')
+            ),
+        )
+        process_post_image(post.id)
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith('.png'))
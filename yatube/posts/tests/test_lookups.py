@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from ..lookups import get_author, get_group, lookup_cache
+from ..models import Group
+
+User = get_user_model()
+
+
+class LookupCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        lookup_cache.clear_local()
+
+    def test_lookups_cached(self):
+        """Повторный поиск автора и группы не обращается к базе."""
+        get_author('auth')
+        get_group('test-slug')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_author('auth'), self.user)
+            self.assertEqual(get_group('test-slug'), self.group)
+
+    def test_missing_cached(self):
+        """Несуществующий адрес тоже запоминается."""
+        with self.assertRaises(Http404):
+            get_author('nobody')
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            get_author('nobody')
+
+    def test_new_user_replaces_missing(self):
+        """Зарегистрированный пользователь сразу находится по имени."""
+        with self.assertRaises(Http404):
+            get_author('newcomer')
+        newcomer = User.objects.create_user(username='newcomer')
+        self.assertEqual(get_author('newcomer'), newcomer)
+
+    def test_changes_invalidate(self):
+        """Переименование и правка группы сбрасывают записи кеша."""
+        get_author('auth')
+        get_group('test-slug')
+        self.user.username = 'renamed'
+        self.user.save()
+        self.group.title = 'Новое название'
+        self.group.save()
+        with self.assertRaises(Http404):
+            get_author('auth')
+        self.assertEqual(get_author('renamed'), self.user)
+        self.assertEqual(get_group('test-slug').title, 'Новое название')
@@ -0,0 +1,85 @@
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..markup import render_markup
+from ..models import Post
+
+User = get_user_model()
+
+
+class MarkupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def test_formatting(self):
+        """Поддерживаются абзацы, выделение, код и ссылки."""
+        html = render_markup(
+            '**жирный** и *курсив* `a*b*`\n'
+            'https://example.com/a_b#part.\n\nвторой 5*3*2'
+        )
+        self.assertEqual(html, (
+            '<p><strong>жирный</strong> и <em>курсив</em> '
+            '<code>a*b*</code><br>'
+            '<a href="https://example.com/a_b#part" '
+            'rel="nofollow noopener">https://example.com/a_b#part</a>.</p>\n'
+            '<p>второй 5*3*2</p>'
+        ))
+
+    def test_unclosed_markers_rendered_quickly(self):
+        """Незакрытые маркеры не делают разбор квадратичным."""
+        for text in ('**a ' * 5000, '*a ' * 20000):
+            started = time.monotonic()
+            html = render_markup(text, set())
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertNotIn('<strong>', html)
+            self.assertNotIn('<em>', html)
+
+    def test_html_escaped(self):
+        """HTML автора выводится как текст."""
+        html = render_markup('<script>alert("x")</script> <b>b</b>')
+        self.assertNotIn('<script>', html)
+        self.assertNotIn('<b>', html)
+        self.assertIn('&lt;script&gt;', html)
+
+    def test_mentions_and_hashtags(self):
+        """Ссылки получают только существующие пользователи."""
+        html = render_markup('@auth и @nobody #тема mail@example.com')
+        self.assertIn('<a class="mention" href="/profile/auth/">@auth</a>',
+                      html)
+        self.assertIn('@nobody', html)
+        self.assertNotIn('/profile/nobody/', html)
+        self.assertIn(
+            '<a class="hashtag" href="/tag/%D1%82%D0%B5%D0%BC%D0%B0/">'
+            '#тема</a>',
+            html
+        )
+        self.assertIn('mail@example.com', html)
+
+    def test_rendered_on_save(self):
+        """Разметка сохраняется вместе с записью и обновляется при правке."""
+        post = Post.objects.create(author=self.user, text='*один*')
+        self.assertEqual(post.text_html, '<p><em>один</em></p>')
+        post.text = '**два**'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><strong>два</strong></p>')
+
+    def test_backfill_command(self):
+        """Команда размечает записи, загруженные без сигналов."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text=f'*пост {number}* @auth')
+            for number in range(3)
+        ])
+        out = StringIO()
+        call_command('render_posts', missing=True, stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertFalse(Post.objects.filter(text_html=''))
+        self.assertIn(
+            '/profile/auth/', Post.objects.first().text_html
+        )
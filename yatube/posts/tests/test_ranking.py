@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Follow, Group, Post, TrendingPost
+from ..ranking import decay, rebuild_trending
+
+User = get_user_model()
+
+
+class RankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.star = User.objects.create_user(username='star')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.quiet_post = Post.objects.create(
+            author=cls.user,
+            text='Тихий пост',
+            group=cls.group,
+        )
+        cls.hot_post = Post.objects.create(
+            author=cls.user,
+            text='Обсуждаемый пост',
+        )
+        cls.star_post = Post.objects.create(
+            author=cls.star,
+            text='Пост популярного автора',
+            group=cls.group,
+        )
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.hot_post, author=cls.star, text=f'Комментарий {i}'
+            )
+        Follow.objects.create(user=cls.user, author=cls.star)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_decay_halves_after_half_life(self):
+        """Вклад события уменьшается вдвое за период полураспада."""
+        self.assertEqual(decay(timedelta(0)), 1)
+        self.assertAlmostEqual(decay(timedelta(hours=24)), 0.5)
+
+    def test_rebuild_trending_orders_global_and_group_feeds(self):
+        """Рейтинг учитывает комментарии и подписчиков автора."""
+        rebuild_trending()
+        global_feed = list(TrendingPost.objects.filter(
+            group=None).values_list('post_id', flat=True))
+        self.assertEqual(
+            global_feed,
+            [self.hot_post.id, self.star_post.id, self.quiet_post.id]
+        )
+        group_feed = list(TrendingPost.objects.filter(
+            group=self.group).values_list('post_id', flat=True))
+        self.assertEqual(group_feed, [self.star_post.id, self.quiet_post.id])
+
+    def test_old_posts_are_not_ranked(self):
+        """Записи старше окна рейтинга не попадают в ленты."""
+        rebuild_trending(now=timezone.now() + timedelta(days=30))
+        self.assertFalse(TrendingPost.objects.exists())
+
+    def test_trending_pages_show_ranked_posts(self):
+        """Ленты популярного берут записи из рассчитанной таблицы."""
+        call_command('rank_posts', top=1, stdout=StringIO())
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']), [self.hot_post])
+        response = self.guest_client.get(reverse(
+            'posts:group_hot', kwargs={'slug': self.group.slug}))
+        self.assertEqual(list(response.context['page_obj']), [self.star_post])
+        self.assertTemplateUsed(response, 'posts/group_list.html')
@@ -0,0 +1,136 @@
+from difflib import SequenceMatcher
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, PostRevision
+from ..revisions import (
+    SNAPSHOT_INTERVAL, apply_delta, make_delta, storage_stats, text_at,
+    versions
+)
+
+User = get_user_model()
+
+
+class PostRevisionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.moderator = User.objects.create_user(
+            username='moderator', is_staff=True
+        )
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user, text='Первая строка.\nВторая строка.'
+        )
+
+    def edit(self, text):
+        self.post.text = text
+        self.post.save()
+
+    def test_delta_round_trip(self):
+        """Разница восстанавливает новый текст из старого."""
+        old = 'Съешь же ещё этих мягких французских булок'
+        new = 'Съешь ещё этих мягких булок, да выпей чаю'
+        self.assertEqual(apply_delta(old, make_delta(old, new)), new)
+        self.assertEqual(apply_delta(old, make_delta(old, '')), '')
+        self.assertEqual(apply_delta('', make_delta('', new)), new)
+
+    def test_long_texts_not_diffed_char_by_char(self):
+        """Длинная изменённая середина не сравнивается посимвольно."""
+        old = 'начало ' + 'а' * 30000 + ' конец'
+        new = 'начало ' + 'б' * 30000 + ' конец'
+        with mock.patch(
+            'posts.revisions.SequenceMatcher', wraps=SequenceMatcher
+        ) as matcher:
+            delta = make_delta(old, new)
+        matcher.assert_not_called()
+        self.assertEqual(apply_delta(old, delta), new)
+        edited = old[:100] + 'правка' + old[100:]
+        self.assertEqual(apply_delta(old, make_delta(old, edited)), edited)
+        self.assertLess(len(make_delta(old, edited)), 100)
+
+    def test_no_history_until_edited(self):
+        """Пока запись не правили, история не хранится."""
+        self.post.save()
+        self.assertFalse(self.post.revisions.exists())
+        self.assertEqual(versions(self.post), [])
+
+    def test_edits_stored_as_deltas(self):
+        """Правки хранятся разницей, исходный текст — снимком."""
+        original = self.post.text
+        edited = original.replace('Вторая', 'Третья')
+        self.edit(edited)
+        first, second = self.post.revisions.all()
+        self.assertTrue(first.snapshot)
+        self.assertEqual(first.data, original)
+        self.assertFalse(second.snapshot)
+        self.assertLess(len(second.data), len(edited))
+        self.assertEqual(text_at(self.post, 1), original)
+        self.assertEqual(text_at(self.post, 2), edited)
+        self.assertIsNone(text_at(self.post, 3))
+
+    def test_periodic_snapshots(self):
+        """Каждая SNAPSHOT_INTERVAL-я версия хранится целиком."""
+        texts = [self.post.text]
+        for number in range(2 * SNAPSHOT_INTERVAL):
+            texts.append(f'{texts[0]}\nДобавка {number}.')
+            self.edit(texts[-1])
+        self.assertEqual(
+            list(self.post.revisions.filter(snapshot=True).values_list(
+                'number', flat=True)),
+            [1, SNAPSHOT_INTERVAL + 1, 2 * SNAPSHOT_INTERVAL + 1]
+        )
+        self.assertEqual(
+            [text for _, text in versions(self.post)], texts
+        )
+        last = len(texts)
+        with self.assertNumQueries(2):
+            self.assertEqual(text_at(self.post, last), texts[-1])
+
+    def test_storage_stats(self):
+        """Метрики сравнивают хранимый объём с полными копиями."""
+        self.edit(self.post.text + ' Ещё.')
+        stats = storage_stats()
+        self.assertEqual(stats['posts'], 1)
+        self.assertEqual(stats['revisions'], 2)
+        self.assertEqual(stats['snapshots'], 1)
+        self.assertEqual(
+            stats['full'], sum(self.post.revisions.values_list(
+                'size', flat=True))
+        )
+        self.assertLess(stats['stored'], stats['full'])
+        out = StringIO()
+        call_command('revision_stats', stdout=out)
+        self.assertIn('версий: 2, снимков: 1', out.getvalue())
+
+    def test_history_page_access(self):
+        """Историю видят автор и модераторы, остальных перенаправляет."""
+        self.edit('Новый текст')
+        url = reverse('posts:post_history', args=(self.post.id,))
+        client = Client()
+        for user in (self.user, self.moderator):
+            client.force_login(user)
+            response = client.get(url)
+            self.assertEqual(
+                [text for _, text in response.context['versions']],
+                ['Новый текст', 'Первая строка.\nВторая строка.']
+            )
+        client.force_login(self.other)
+        self.assertRedirects(
+            client.get(url),
+            reverse('posts:post_detail', args=(self.post.id,))
+        )
+
+    def test_post_delete_removes_history(self):
+        """История удаляется вместе с записью."""
+        self.edit('Новый текст')
+        self.post.delete()
+        self.assertFalse(PostRevision.objects.exists())
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from ..models import Comment, Follow, Group, GroupStats, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class SeedScaleTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def seed(self, seed=7):
+        call_command(
+            'seed_scale', users=30, groups=3, posts=120, comments=200,
+            follows=60, images=2, days=10, seed=seed, processes=2,
+            stdout=StringIO(),
+        )
+
+    def snapshot(self):
+        return list(Post.objects.order_by('id').values_list(
+            'author__username', 'group__slug', 'text', 'image'))
+
+    def test_seed_scale_creates_requested_volume(self):
+        """Команда создаёт заданное количество объектов."""
+        self.seed()
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 120)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(0 < Follow.objects.count() <= 60)
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        dates = list(Post.objects.order_by('id').values_list(
+            'pub_date', flat=True))
+        self.assertEqual(dates, sorted(dates))
+
+    def test_seed_scale_fills_derived_data(self):
+        """После заполнения есть статистика групп и размеченные тексты."""
+        self.seed()
+        self.assertEqual(
+            sum(GroupStats.objects.values_list('posts_count', flat=True)),
+            Post.objects.exclude(group=None).count()
+        )
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists()
+        )
+        self.assertGreater(
+            Comment.objects.dates('created', 'day').count(), 1
+        )
+
+    def test_seed_scale_is_deterministic(self):
+        """Одинаковый seed даёт одинаковые данные."""
+        self.seed()
+        first = self.snapshot()
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed()
+        self.assertEqual(self.snapshot(), first)
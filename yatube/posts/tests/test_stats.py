@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, GroupDailyStats, GroupStats, Post
+from ..stats import group_summary
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        Post.objects.create(
+            author=self.user, text='Второй пост', group=self.group
+        )
+        Post.objects.create(
+            author=self.other, text='Пост другого автора', group=self.group
+        )
+        Comment.objects.create(
+            post=self.post, author=self.other, text='Комментарий'
+        )
+
+    def assertStats(self, group, posts, authors, comments):
+        stats = GroupStats.objects.get(group=group)
+        self.assertEqual(
+            (stats.posts_count, stats.authors_count, stats.comments_count),
+            (posts, authors, comments)
+        )
+
+    def test_stats_follow_posts_and_comments(self):
+        """Счётчики группы обновляются при создании записей и комментариев."""
+        self.assertStats(self.group, posts=3, authors=2, comments=1)
+        daily = GroupDailyStats.objects.get(group=self.group)
+        self.assertEqual(daily.posts_count, 3)
+        self.assertEqual(daily.comments_count, 1)
+
+    def test_stats_follow_moves_and_deletes(self):
+        """Перенос и удаление записи переносят и её счётчики."""
+        self.post.group = self.other_group
+        self.post.save()
+        self.assertStats(self.group, posts=2, authors=2, comments=0)
+        self.assertStats(self.other_group, posts=1, authors=1, comments=1)
+        self.assertEqual(group_summary(self.group)['recent_comments'], 0)
+        self.assertEqual(
+            group_summary(self.other_group)['recent_comments'], 1
+        )
+        self.post.delete()
+        self.assertStats(self.other_group, posts=0, authors=0, comments=0)
+
+    def test_stats_follow_author_deletion(self):
+        """Удаление автора со всеми записями уменьшает число авторов."""
+        User.objects.get(id=self.user.id).delete()
+        self.assertStats(self.group, posts=1, authors=1, comments=0)
+
+    def test_reconcile_matches_incremental_stats(self):
+        """Ночной пересчёт совпадает с накопленными счётчиками."""
+        GroupStats.objects.update(posts_count=100)
+        GroupDailyStats.objects.all().delete()
+        call_command('reconcile_group_stats', stdout=StringIO())
+        self.assertStats(self.group, posts=3, authors=2, comments=1)
+        self.assertEqual(
+            GroupDailyStats.objects.get(group=self.group).posts_count, 3
+        )
+
+    def test_group_page_shows_stats(self):
+        """На странице группы выводится её статистика."""
+        response = self.guest_client.get(reverse(
+            'posts:group_posts', kwargs={'slug': self.group.slug}))
+        stats = response.context['stats']
+        self.assertEqual(stats['posts'], 3)
+        self.assertEqual(stats['recent_comments'], 1)
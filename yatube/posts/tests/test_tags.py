@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Mention, Post, PostTag, Tag
+
+User = get_user_model()
+
+
+class TagIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_tags_and_mentions_indexed(self):
+        """Теги и упоминания попадают в индекс при сохранении."""
+        post = Post.objects.create(
+            author=self.user, text='#Django и #python для @reader и @nobody'
+        )
+        self.assertEqual(
+            set(post.post_tags.values_list('tag__name', flat=True)),
+            {'django', 'python'}
+        )
+        self.assertEqual(
+            list(post.mentions.values_list('user__username', flat=True)),
+            ['reader']
+        )
+        self.assertIn('href="/tag/django/"', post.text_html)
+
+    def test_edit_keeps_unchanged_rows(self):
+        """Правка меняет только изменившиеся строки индекса."""
+        post = Post.objects.create(author=self.user, text='#one #two')
+        kept = PostTag.objects.get(post=post, tag__name='one').id
+        post.text = '#one #three'
+        post.save()
+        self.assertEqual(
+            dict(post.post_tags.values_list('tag__name', 'id'))['one'], kept
+        )
+        self.assertEqual(
+            set(post.post_tags.values_list('tag__name', flat=True)),
+            {'one', 'three'}
+        )
+        self.assertTrue(Tag.objects.filter(name='two').exists())
+
+    def test_unchanged_text_not_reindexed(self):
+        """Сохранение без правки текста не трогает индекс."""
+        post = Post.objects.create(author=self.user, text='#one')
+        with self.assertNumQueries(0):
+            from ..signals import index_post_text
+            post._stored_text = post.text
+            index_post_text(Post, post)
+
+    def test_tag_feed_keyset_pages(self):
+        """Лента тега листается по курсору без пропусков и повторов."""
+        posts = [
+            Post.objects.create(author=self.user, text=f'#лента {number}')
+            for number in range(13)
+        ]
+        Post.objects.create(author=self.user, text='без тега')
+        response = self.guest_client.get(
+            reverse('posts:tag', args=('Лента',))
+        )
+        first = response.context['posts']
+        self.assertEqual(len(first), 10)
+        second = self.guest_client.get(response.context['next_url'])
+        self.assertIsNone(second.context['next_url'])
+        self.assertEqual(
+            [post.id for post in first + second.context['posts']],
+            [post.id for post in reversed(posts)]
+        )
+
+    def test_unknown_tag_404(self):
+        """Несуществующий тег даёт 404."""
+        response = self.guest_client.get(reverse('posts:tag', args=('x',)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mentions_feed(self):
+        """Лента упоминаний показывает только записи с пользователем."""
+        post = Post.objects.create(author=self.user, text='привет @reader')
+        Post.objects.create(author=self.user, text='без упоминаний')
+        response = self.guest_client.get(
+            reverse('posts:mentions', args=('reader',))
+        )
+        self.assertEqual(response.context['posts'], [post])
+        self.assertEqual(Mention.objects.count(), 1)
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Comment, Follow, Group, GroupStats, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class TransferTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir, ignore_errors=True)
+        self.user = User.objects.create_user(username='auth', password='pw')
+        self.follower = User.objects.create_user(username='follower')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            group=self.group,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.follower, text='Комментарий'
+        )
+        self.old_date = timezone.make_aware(datetime(2015, 3, 1, 12, 30))
+        Post.objects.filter(id=self.post.id).update(pub_date=self.old_date)
+        Comment.objects.filter(id=self.comment.id).update(
+            created=self.old_date
+        )
+        Follow.objects.create(user=self.follower, author=self.user)
+
+    def test_export_and_import_round_trip(self):
+        """Выгрузка загружается обратно без потерь, вместе с картинками."""
+        call_command('export_yatube', self.export_dir, stdout=StringIO())
+        self.assertTrue(os.path.exists(
+            os.path.join(self.export_dir, 'media', self.post.image.name)
+        ))
+        image_name = self.post.image.name
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        os.remove(os.path.join(TEMP_MEDIA_ROOT, image_name))
+
+        call_command(
+            'import_yatube', self.export_dir, chunk_size=1, stdout=StringIO()
+        )
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual(post.text, 'Тестовый пост')
+        self.assertEqual(post.author.username, 'auth')
+        self.assertEqual(post.group.slug, 'test-slug')
+        self.assertTrue(post.author.check_password('pw'))
+        self.assertTrue(post.image.storage.exists(post.image.name))
+        self.assertTrue(Follow.objects.filter(
+            user__username='follower', author=post.author).exists())
+        self.assertEqual(post.comments.count(), 1)
+        self.assertEqual(post.pub_date, self.old_date)
+        self.assertEqual(post.comments.get().created, self.old_date)
+        self.assertEqual(GroupStats.objects.get().posts_count, 1)
+
+    def test_import_skips_existing_rows(self):
+        """Повторная загрузка не создаёт дубликатов."""
+        call_command('export_yatube', self.export_dir, stdout=StringIO())
+        call_command('import_yatube', self.export_dir, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_import_keeps_dates_of_existing_rows(self):
+        """Даты выгрузки не переносятся на другую строку с тем же id."""
+        call_command('export_yatube', self.export_dir, stdout=StringIO())
+        local_date = timezone.make_aware(datetime(2024, 6, 1, 9, 0))
+        Post.objects.filter(id=self.post.id).update(
+            text='Местный пост', pub_date=local_date
+        )
+        call_command('import_yatube', self.export_dir, stdout=StringIO())
+        post = Post.objects.get(id=self.post.id)
+        self.assertEqual(post.text, 'Местный пост')
+        self.assertEqual(post.pub_date, local_date)
@@ -10,7 +10,10 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.core.cache import cache
 
-from ..models import Group, Post, Follow
+from core.storage import ContentAddressedStorage
+
+from ..models import Comment, Follow, Group, Post
+from ..utils import COMMENTS_PER_PAGE, get_post_detail
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -41,6 +44,9 @@ class PostViewsTests(TestCase):
             content=small_gif,
             content_type='image/gif'
         )
+        cls.image_name = ContentAddressedStorage.hashed_name(
+            'posts/small.gif', uploaded
+        )
         cls.post = Post.objects.create(
             author=cls.user,
             text='Тестовый пост',
@@ -91,7 +97,7 @@ class PostViewsTests(TestCase):
         self.assertEqual(post_text_0, 'Тестовый пост')
         self.assertEqual(post_author_0.username, 'auth')
         self.assertEqual(post_group_0.title, 'Тестовая группа')
-        self.assertEqual(post_image_0, 'posts/small.gif')
+        self.assertEqual(post_image_0, self.image_name)
 
     def test_group_list_page_show_correct_context(self):
         """Шаблон group_list сформирован с правильным подтекстом."""
@@ -107,7 +113,7 @@ class PostViewsTests(TestCase):
         self.assertEqual(post_author_0.username, 'auth')
         self.assertEqual(post_group_0.title, 'Тестовая группа')
         self.assertEqual(post_slug_0, 'test-slug')
-        self.assertEqual(post_image_0, 'posts/small.gif')
+        self.assertEqual(post_image_0, self.image_name)
 
     def test_profile_page_show_correct_context(self):
         """Шаблон profile сформирован с правильным подтекстом."""
@@ -121,7 +127,7 @@ class PostViewsTests(TestCase):
         self.assertEqual(post_text_0, 'Тестовый пост')
         self.assertEqual(post_author_0.username, 'auth')
         self.assertEqual(post_group_0.title, 'Тестовая группа')
-        self.assertEqual(post_image_0, 'posts/small.gif')
+        self.assertEqual(post_image_0, self.image_name)
 
     def test_post_detail_page_show_correct_context(self):
         """Шаблон post_detail сформирован с правильным подтекстом."""
@@ -132,7 +138,9 @@ class PostViewsTests(TestCase):
         self.assertEqual(
             response.context.get('post').group.title, 'Тестовая группа'
         )
-        self.assertEqual(response.context.get('post').image, 'posts/small.gif')
+        self.assertEqual(
+            response.context.get('post').image, self.image_name
+        )
 
     def test_post_create_page_show_correct_context(self):
         """Шаблон post_create сформирован с правильным подтекстом."""
@@ -159,6 +167,97 @@ class PostViewsTests(TestCase):
                 form_field = response.context.get('form').fields.get(value)
                 self.assertIsInstance(form_field, expected)
 
+    def test_post_detail_warm_cache_without_queries(self):
+        """Повторная сборка страницы поста не обращается к базе данных."""
+        post = Post.objects.create(author=self.user, text='Пост без картинки')
+        get_post_detail(post.id)
+        with self.assertNumQueries(0):
+            bundle = get_post_detail(post.id)
+        self.assertEqual(bundle['post'], post)
+        self.assertEqual(bundle['author_posts_count'], 2)
+
+    def test_post_detail_author_count_follows_new_posts(self):
+        """Новая запись автора обновляет счётчик на страницах его постов."""
+        get_post_detail(self.post.id)
+        Post.objects.create(author=self.user, text='Ещё одна запись')
+        self.assertEqual(
+            get_post_detail(self.post.id)['author_posts_count'], 2
+        )
+
+    def test_post_detail_comments_paginated(self):
+        """В пакете только первая страница комментариев, дальше — ?page."""
+        self.post.comments.all().delete()
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.user, text=f'Комментарий {i}')
+            for i in range(COMMENTS_PER_PAGE + 3)
+        ])
+        cache.clear()
+        bundle = get_post_detail(self.post.id)
+        self.assertEqual(len(bundle['comments']), COMMENTS_PER_PAGE)
+        self.assertEqual(bundle['comments_count'], COMMENTS_PER_PAGE + 3)
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        response = self.authorized_client.get(url + '?page=2')
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            [f'Комментарий {i}' for i in range(
+                COMMENTS_PER_PAGE, COMMENTS_PER_PAGE + 3)]
+        )
+
+    def test_anonymous_pages_cached(self):
+        """Гостям страницы отдаются из кэша до изменения записей."""
+        cache.clear()
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Тестовый пост')
+        Post.objects.create(author=self.user, text='Свежий пост')
+        self.assertContains(self.guest_client.get(url), 'Свежий пост')
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованным пользователям страницы не отдаются из кэша."""
+        cache.clear()
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        self.guest_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Подписаться')
+        self.assertIsNotNone(response.context)
+
+    def test_post_detail_cache_invalidated(self):
+        """Кэш страницы поста сбрасывается при комментарии и правке."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.guest_client.get(url)
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='Новый комментарий'
+        )
+        response = self.guest_client.get(url)
+        self.assertIn(comment, response.context['comments'])
+        self.post.text = 'Отредактированный пост'
+        self.post.save()
+        response = self.guest_client.get(url)
+        self.assertEqual(
+            response.context['post'].text, 'Отредактированный пост'
+        )
+
+    def test_post_detail_group_neighbours(self):
+        """На странице поста есть ссылки на соседние записи группы."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.guest_client.get(url)
+        post_new = Post.objects.create(
+            author=self.user, text='Следующий пост', group=self.group
+        )
+        response = self.guest_client.get(url)
+        self.assertEqual(response.context['next_post_id'], post_new.id)
+        response = self.guest_client.get(reverse(
+            'posts:post_detail', kwargs={'post_id': post_new.id}))
+        self.assertEqual(response.context['previous_post_id'], self.post.id)
+        post_new.group = Group.objects.create(
+            title='Другая группа', slug='other-group'
+        )
+        post_new.save()
+        response = self.guest_client.get(url)
+        self.assertIsNone(response.context['next_post_id'])
+
     def test_cache_index(self):
         """Проверка кэширования для index."""
         response = self.authorized_client.get(reverse('posts:index'))
@@ -287,6 +386,17 @@ class PaginatorViewsTest(TestCase):
             'posts:profile', kwargs={'username': 'auth'}) + '?page=2')
         self.assertEqual(len(response.context['page_obj']), 4)
 
+    def test_group_list_queries_do_not_depend_on_posts(self):
+        """Проверка: авторы постов подгружаются одним запросом.
+
+        Группа уже известна странице, авторы при пустом кеше
+        загружаются одним запросом по списку id.
+        """
+        cache.clear()
+        with self.assertNumQueries(6):
+            self.guest_client.get(reverse(
+                'posts:group_posts', kwargs={'slug': 'test-slug'}))
+
     def test_post_on_index(self):
         """Проверка: созданный пост есть на главной странице."""
         response = self.authorized_client.get(reverse('posts:index'))
@@ -309,3 +419,42 @@ class PaginatorViewsTest(TestCase):
         response = self.authorized_client.get(reverse(
             'posts:group_posts', kwargs={'slug': 'test-slug'}))
         self.assertNotIn(Post.objects.get(id=14), response.context['page_obj'])
+
+    def test_index_fragment_continues_first_page(self):
+        """Проверка: подгрузка продолжает ленту после первой страницы."""
+        cache.clear()
+        response = self.guest_client.get(reverse('posts:index'))
+        first_page = list(response.context['page_obj'])
+        fragment = self.guest_client.get(response.context['next_fragment_url'])
+        self.assertTemplateUsed(fragment, 'posts/includes/post_cards.html')
+        self.assertEqual(
+            first_page + fragment.context['posts'],
+            list(Post.objects.order_by('-pub_date', '-id'))
+        )
+        self.assertIsNone(fragment.context['next_fragment_url'])
+
+    def test_group_fragment_keeps_group(self):
+        """Проверка: подгрузка ленты группы не выходит за её пределы."""
+        cache.clear()
+        response = self.guest_client.get(reverse(
+            'posts:group_posts', kwargs={'slug': 'test-slug'}))
+        fragment = self.guest_client.get(response.context['next_fragment_url'])
+        self.assertEqual(len(fragment.context['posts']), 3)
+        self.assertNotIn(
+            self.post_without_group, fragment.context['posts']
+        )
+
+    def test_fragment_bad_cursor(self):
+        """Проверка: испорченный курсор даёт ошибку 400."""
+        for cursor in ('abc', '99999999999999999999999-1', '1-' + '9' * 20):
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    reverse('posts:index_fragment') + '?cursor=' + cursor
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_follow_fragment_requires_login(self):
+        """Проверка: подгрузка избранного доступна только после входа."""
+        url = reverse('posts:follow_fragment')
+        response = self.guest_client.get(url)
+        self.assertRedirects(response, f'/auth/login/?next={url}')
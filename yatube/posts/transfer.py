@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Follow, Group, Post, PostRevision
+
+User = get_user_model()
+
+DATA_FILE = 'data.jsonl'
+MEDIA_DIR = 'media'
+CHUNK_SIZE = 2000
+
+# Порядок важен: при загрузке связанные строки должны идти раньше ссылок.
+MODELS = (
+    ('user', User, (
+        'username', 'first_name', 'last_name', 'email', 'password',
+        'is_staff', 'is_active', 'is_superuser', 'date_joined', 'last_login',
+    )),
+    ('group', Group, ('title', 'slug', 'description')),
+    ('post', Post, ('text', 'pub_date', 'author_id', 'group_id', 'image')),
+    ('comment', Comment, ('post_id', 'author_id', 'text', 'created')),
+    ('revision', PostRevision, (
+        'post_id', 'number', 'snapshot', 'data', 'size', 'created',
+    )),
+    ('follow', Follow, ('user_id', 'author_id')),
+)
+DATETIME_FIELDS = ('date_joined', 'last_login', 'pub_date', 'created')
+image_storage = Post._meta.get_field('image').storage
+
+
+def export_data(directory, chunk_size=CHUNK_SIZE):
+    """Выгружает данные проекта построчным JSON и копирует картинки.
+
+    Строки читаются курсором порциями по ``chunk_size``, поэтому
+    расход памяти не зависит от размера таблиц.
+    """
+    os.makedirs(os.path.join(directory, MEDIA_DIR), exist_ok=True)
+    counts = {}
+    with open(os.path.join(directory, DATA_FILE), 'w') as data:
+        for label, model, fields in MODELS:
+            rows = model.objects.order_by('pk').values_list('pk', *fields)
+            counts[label] = 0
+            for pk, *values in rows.iterator(chunk_size=chunk_size):
+                record = dict(zip(fields, values))
+                if label == 'post' and record['image']:
+                    _export_image(directory, record['image'])
+                data.write(json.dumps(
+                    {'model': label, 'pk': pk, 'fields': record},
+                    cls=DjangoJSONEncoder, ensure_ascii=False,
+                ))
+                data.write('\n')
+                counts[label] += 1
+    return counts
+
+
+def _export_image(directory, name):
+    target = os.path.join(directory, MEDIA_DIR, name)
+    if os.path.exists(target) or not image_storage.exists(name):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with image_storage.open(name) as source, open(target, 'wb') as out:
+        shutil.copyfileobj(source, out)
+
+
+def import_data(directory, chunk_size=CHUNK_SIZE):
+    """Загружает выгрузку ``export_data`` пакетными вставками.
+
+    Каждая пачка пишется в своей транзакции; строки, нарушающие
+    ограничения уникальности (например, уже загруженные), пропускаются.
+    """
+    models = {label: model for label, model, _ in MODELS}
+    counts = {label: 0 for label in models}
+    batch, batch_label = [], None
+    with open(os.path.join(directory, DATA_FILE)) as data:
+        for line in data:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            label = record['model']
+            if batch and (label != batch_label or len(batch) >= chunk_size):
+                counts[batch_label] += _flush(models[batch_label], batch)
+                batch = []
+            batch_label = label
+            fields = record['fields']
+            for name in DATETIME_FIELDS:
+                if fields.get(name):
+                    fields[name] = parse_datetime(fields[name])
+            if label == 'post' and fields['image']:
+                fields['image'] = _import_image(directory, fields['image'])
+            batch.append(models[label](pk=record['pk'], **fields))
+    if batch:
+        counts[batch_label] += _flush(models[batch_label], batch)
+    _reset_sequences([model for _, model, _ in MODELS])
+    return counts
+
+
+def _flush(model, objects):
+    """Вставляет пачку, сохраняя выгруженные даты.
+
+    ``bulk_create`` проставляет полям с ``auto_now_add`` текущее время,
+    поэтому выгруженные значения возвращаются отдельным ``bulk_update``,
+    и только строкам, которые вставила эта пачка: уже существующие
+    строки с теми же id (возможно, совсем другие) не трогаются.
+    """
+    dates = [
+        field.attname for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    exported = [[getattr(obj, name) for name in dates] for obj in objects]
+    with transaction.atomic():
+        existing = set(model.objects.filter(
+            pk__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True)) if dates else set()
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        inserted = []
+        for obj, values in zip(objects, exported):
+            if obj.pk in existing:
+                continue
+            for name, value in zip(dates, values):
+                setattr(obj, name, value)
+            inserted.append(obj)
+        if dates and inserted:
+            model.objects.bulk_update(inserted, dates)
+    return len(objects)
+
+
+def _import_image(directory, name):
+    if image_storage.exists(name):
+        return name
+    source = os.path.join(directory, MEDIA_DIR, name)
+    if not os.path.exists(source):
+        return name
+    with open(source, 'rb') as image:
+        return image_storage.save(name, File(image))
+
+
+def _reset_sequences(models):
+    """Сдвигает счётчики первичных ключей после вставки готовых id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -9,14 +9,30 @@ urlpatterns = [
     path('', views.index, name='index'),
     # Список сообществ по группам
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    # Популярные записи группы
+    path('group/<slug:slug>/hot/', views.group_hot, name='group_hot'),
+    # Популярные записи сайта
+    path('trending/', views.trending, name='trending'),
     # Профайл пользователя
     path('profile/<str:username>/', views.profile, name='profile'),
+    # Записи с упоминанием пользователя
+    path(
+        'profile/<str:username>/mentions/', views.mentions,
+        name='mentions'
+    ),
+    # Записи с хэштегом
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
     # Просмотр записи
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     # Новый пост
     path('create/', views.post_create, name='post_create'),
     # Редактирование поста
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    # История правок поста
+    path(
+        'posts/<int:post_id>/history/', views.post_history,
+        name='post_history'
+    ),
     # Новый комментарий
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
@@ -29,6 +45,31 @@ urlpatterns = [
         views.profile_follow,
         name='profile_follow'
     ),
+    # Подгрузка лент при прокрутке
+    path(
+        'fragments/index/', views.feed_fragment, {'feed': 'index'},
+        name='index_fragment'
+    ),
+    path(
+        'fragments/group/<slug:key>/', views.feed_fragment,
+        {'feed': 'group'}, name='group_fragment'
+    ),
+    path(
+        'fragments/profile/<str:key>/', views.feed_fragment,
+        {'feed': 'profile'}, name='profile_fragment'
+    ),
+    path(
+        'fragments/follow/', views.follow_fragment, {'feed': 'follow'},
+        name='follow_fragment'
+    ),
+    path(
+        'fragments/tag/<str:key>/', views.feed_fragment, {'feed': 'tag'},
+        name='tag_fragment'
+    ),
+    path(
+        'fragments/mentions/<str:key>/', views.feed_fragment,
+        {'feed': 'mentions'}, name='mentions_fragment'
+    ),
     # Отписаться от автора
     path(
         'profile/<str:username>/unfollow/',
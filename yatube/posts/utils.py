@@ -1,4 +1,19 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+
+from .models import Comment, Post
+
+POST_DETAIL_CACHE_KEY = 'post_detail:{}'
+POST_DETAIL_CACHE_TIMEOUT = 60 * 5
+AUTHOR_POSTS_COUNT_KEY = 'author_posts_count:{}'
+COMMENTS_PER_PAGE = 20
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MAX_ID = 2 ** 63
 
 
 def paginate_post(request, posts, numbers):
@@ -7,3 +22,102 @@ def paginate_post(request, posts, numbers):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def make_cursor(post):
+    """Курсор ленты: время публикации в микросекундах и id записи."""
+    delta = post.pub_date - EPOCH
+    micro = (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+    return f'{micro}-{post.id}'
+
+
+def after_cursor(posts, cursor):
+    """Записи ленты, идущие после курсора (ValueError при ошибке в нём)."""
+    micro, post_id = map(int, cursor.split('-'))
+    try:
+        pub_date = EPOCH + timedelta(microseconds=micro)
+    except OverflowError:
+        raise ValueError('Дата курсора вне допустимого диапазона')
+    if not 0 < post_id < MAX_ID:
+        raise ValueError('id курсора вне допустимого диапазона')
+    return posts.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=post_id)
+    ).order_by('-pub_date', '-id')
+
+
+def next_fragment_url(url, page_obj):
+    """Адрес подгрузки записей, следующих за страницей ``page_obj``."""
+    if not page_obj.has_next():
+        return None
+    return f'{url}?cursor={make_cursor(page_obj[len(page_obj) - 1])}'
+
+
+def build_post_detail(post_id):
+    """Собирает всё, что нужно странице поста, за один проход.
+
+    Из комментариев в пакет попадает только первая страница: новый
+    комментарий не заставляет пересобирать и хранить весь список.
+    """
+    try:
+        post = Post.objects.with_identity('author', 'group').get(
+            id=post_id
+        )
+    except Post.DoesNotExist:
+        raise Http404('Пост не найден')
+    bundle = {
+        'post': post,
+        'comments': list(
+            post_comments(post.id)[:COMMENTS_PER_PAGE]
+        ),
+        'comments_count': post.comments.count(),
+        'previous_post_id': None,
+        'next_post_id': None,
+    }
+    if post.group_id is not None:
+        group_posts = Post.objects.filter(group_id=post.group_id)
+        bundle['previous_post_id'] = group_posts.filter(
+            pub_date__lt=post.pub_date
+        ).order_by('-pub_date').values_list('id', flat=True).first()
+        bundle['next_post_id'] = group_posts.filter(
+            pub_date__gt=post.pub_date
+        ).order_by('pub_date').values_list('id', flat=True).first()
+    return bundle
+
+
+def post_comments(post_id):
+    return Comment.objects.filter(post_id=post_id).with_identity(
+        'author').order_by('created', 'id')
+
+
+def get_post_detail(post_id):
+    """Отдаёт данные страницы поста из кэша, собирая их при промахе.
+
+    Число записей автора меняется с каждой его новой записью, поэтому
+    хранится отдельно от пакета, один раз на автора.
+    """
+    key = POST_DETAIL_CACHE_KEY.format(post_id)
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = build_post_detail(post_id)
+        cache.set(key, bundle, POST_DETAIL_CACHE_TIMEOUT)
+    author_id = bundle['post'].author_id
+    count_key = AUTHOR_POSTS_COUNT_KEY.format(author_id)
+    count = cache.get(count_key)
+    if count is None:
+        count = Post.objects.filter(author_id=author_id).count()
+        cache.set(count_key, count, POST_DETAIL_CACHE_TIMEOUT)
+    return dict(bundle, author_posts_count=count)
+
+
+def invalidate_author_posts_count(*author_ids):
+    cache.delete_many([
+        AUTHOR_POSTS_COUNT_KEY.format(author_id) for author_id in author_ids
+    ])
+
+
+def invalidate_post_detail(*post_ids):
+    """Сбрасывает закэшированные страницы постов."""
+    cache.delete_many([
+        POST_DETAIL_CACHE_KEY.format(post_id)
+        for post_id in post_ids if post_id is not None
+    ])
@@ -1,72 +1,128 @@
-from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
-from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post
-from .utils import paginate_post
+from core.decorators import cache_anonymous_page
+from core.ratelimit import ratelimit
 
-User = get_user_model()
+from .forms import CommentForm, PostForm
+from .images import schedule_image_processing
+from .lookups import get_author, get_group
+from .models import Follow, Post, Tag
+from .ranking import trending_posts
+from .revisions import versions
+from .stats import group_summary
+from .utils import (
+    COMMENTS_PER_PAGE, after_cursor, get_post_detail, make_cursor,
+    next_fragment_url, paginate_post, post_comments
+)
 
 NUMBER_ENTRIES_FOR_PAGE = 10
 
 
+@cache_anonymous_page
 def index(request):
     """Страница с последними обновлениями сайта."""
-    post_list = Post.objects.select_related().all()
+    post_list = Post.objects.with_identity('author', 'group')
     page_obj = paginate_post(request, post_list, NUMBER_ENTRIES_FOR_PAGE)
     context = {
         'page_obj': page_obj,
+        'next_fragment_url': next_fragment_url(
+            reverse('posts:index_fragment'), page_obj
+        ),
     }
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page
 def group_posts(request, slug):
     """Страница с записями группы."""
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    group = get_group(slug)
+    post_list = group.posts.with_identity('author', 'group')
     page_obj = paginate_post(request, post_list, NUMBER_ENTRIES_FOR_PAGE)
     context = {
         'group': group,
         'page_obj': page_obj,
+        'stats': group_summary(group),
+        'next_fragment_url': next_fragment_url(
+            reverse('posts:group_fragment', args=(slug,)), page_obj
+        ),
+    }
+    return render(request, 'posts/group_list.html', context)
+
+
+@cache_anonymous_page
+def group_hot(request, slug):
+    """Популярные записи группы."""
+    group = get_group(slug)
+    page_obj = paginate_post(
+        request, trending_posts(group), NUMBER_ENTRIES_FOR_PAGE
+    )
+    context = {
+        'group': group,
+        'page_obj': page_obj,
+        'hot': True,
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@cache_anonymous_page
+def trending(request):
+    """Популярные записи всего сайта."""
+    page_obj = paginate_post(
+        request, trending_posts(), NUMBER_ENTRIES_FOR_PAGE
+    )
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@cache_anonymous_page
 def profile(request, username):
     """Страница с профайлом пользователя."""
-    author = get_object_or_404(User, username=username)
-    profile_list = author.posts.all()
+    author = get_author(username)
+    profile_list = author.posts.with_identity('author', 'group')
     page_obj = paginate_post(
         request, profile_list, NUMBER_ENTRIES_FOR_PAGE
     )
-    is_exists = Follow.objects.filter(
-        user=request.user.id, author=author).exists()
-    following = request.user.is_authenticated and is_exists
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author).exists()
     context = {
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'next_fragment_url': next_fragment_url(
+            reverse('posts:profile_fragment', args=(username,)), page_obj
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cache_anonymous_page
 def post_detail(request, post_id):
     """Страница поста."""
-    post = get_object_or_404(Post, id=post_id)
-    title = post.text[:30]
-    form = CommentForm()
-    comments = Comment.objects.filter(post=post)
-    context = {
-        'post': post,
-        'title': title,
-        'form': form,
-        'comments': comments,
-    }
+    context = get_post_detail(post_id)
+    # Первая страница комментариев уже в пакете, число комментариев
+    # известно, поэтому паджинатор обращается к базе только за
+    # следующими страницами.
+    paginator = Paginator(post_comments(post_id), COMMENTS_PER_PAGE)
+    paginator.count = context['comments_count']
+    page_obj = paginator.get_page(request.GET.get('page'))
+    if page_obj.number > 1:
+        context['comments'] = list(page_obj)
+    context.update({
+        'title': context['post'].text[:30],
+        'form': CommentForm(),
+        'page_obj': page_obj,
+    })
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@ratelimit('post_create', user_rate='10/m', ip_rate='30/m')
 def post_create(request):
     """Страница для создания нового поста."""
     form = PostForm(
@@ -77,6 +133,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        if post.image:
+            schedule_image_processing(post.id)
         return redirect('posts:profile', post.author)
     context = {
         'form': form,
@@ -96,7 +154,9 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        post = form.save()
+        if post.image and 'image' in form.changed_data:
+            schedule_image_processing(post.id)
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -107,6 +167,20 @@ def post_edit(request, post_id):
 
 
 @login_required
+def post_history(request, post_id):
+    """История правок поста: видна автору и модераторам."""
+    post = get_object_or_404(Post, id=post_id)
+    if request.user.id != post.author_id and not request.user.is_staff:
+        return redirect('posts:post_detail', post_id)
+    context = {
+        'post': post,
+        'versions': versions(post)[::-1],
+    }
+    return render(request, 'posts/post_history.html', context)
+
+
+@login_required
+@ratelimit('add_comment', user_rate='20/m', ip_rate='60/m')
 def add_comment(request, post_id):
     """Страница для добавления комментария."""
     post = get_object_or_404(Post, id=post_id)
@@ -121,19 +195,27 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
+    post_list = Post.objects.filter(
+        author__following__user=request.user
+    ).with_identity('author', 'group')
     page_obj = paginate_post(
         request, post_list, NUMBER_ENTRIES_FOR_PAGE
     )
     context = {
         'page_obj': page_obj,
+        'next_fragment_url': next_fragment_url(
+            reverse('posts:follow_fragment'), page_obj
+        ),
     }
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
+@ratelimit(
+    'follow', user_rate='30/m', ip_rate='100/m', methods=('GET', 'POST')
+)
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_author(username)
     is_follower = Follow.objects.filter(
         user=request.user, author=author).exists()
     if request.user.username == username or is_follower:
@@ -143,7 +225,101 @@ def profile_follow(request, username):
 
 
 @login_required
+@ratelimit(
+    'follow', user_rate='30/m', ip_rate='100/m', methods=('GET', 'POST')
+)
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_author(username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username)
+
+
+def _feed_posts(request, feed, key):
+    posts = Post.objects.with_identity('author', 'group')
+    if feed == 'group':
+        return posts.filter(group=get_group(key))
+    if feed == 'profile':
+        return posts.filter(author=get_author(key))
+    if feed == 'follow':
+        return posts.filter(author__following__user=request.user)
+    if feed == 'tag':
+        return posts.filter(post_tags__tag__name=key)
+    if feed == 'mentions':
+        return posts.filter(mentions__user=get_author(key))
+    return posts
+
+
+def _keyset_batch(request, posts):
+    """Порция ленты после курсора из ?cursor= и курсор следующей.
+
+    Неверный курсор приводит к ValueError.
+    """
+    posts = posts.order_by('-pub_date', '-id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        posts = after_cursor(posts, cursor)
+    batch = list(posts[:NUMBER_ENTRIES_FOR_PAGE + 1])
+    if len(batch) > NUMBER_ENTRIES_FOR_PAGE:
+        batch = batch[:NUMBER_ENTRIES_FOR_PAGE]
+        return batch, make_cursor(batch[-1])
+    return batch, None
+
+
+@cache_anonymous_page
+def feed_fragment(request, feed, key=None):
+    """Очередная порция карточек ленты для бесконечной прокрутки."""
+    try:
+        batch, cursor = _keyset_batch(
+            request, _feed_posts(request, feed, key)
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    context = {
+        'posts': batch,
+        'show_author': feed != 'profile',
+        'next_fragment_url': (
+            f'{request.path}?cursor={cursor}' if cursor else None
+        ),
+    }
+    return render(request, 'posts/includes/post_cards.html', context)
+
+
+def _keyset_feed(request, feed, key, title):
+    try:
+        batch, cursor = _keyset_batch(
+            request, _feed_posts(request, feed, key)
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    context = {
+        'title': title,
+        'posts': batch,
+        'next_url': None,
+        'next_fragment_url': None,
+    }
+    if cursor:
+        context['next_url'] = f'{request.path}?cursor={cursor}'
+        context['next_fragment_url'] = reverse(
+            f'posts:{feed}_fragment', args=(key,)
+        ) + f'?cursor={cursor}'
+    return render(request, 'posts/feed.html', context)
+
+
+@cache_anonymous_page
+def tag_posts(request, name):
+    """Записи с хэштегом, по курсору от новых к старым."""
+    tag = get_object_or_404(Tag, name=name.lower())
+    return _keyset_feed(request, 'tag', tag.name, f'#{tag.name}')
+
+
+@cache_anonymous_page
+def mentions(request, username):
+    """Записи, в которых упомянут пользователь."""
+    author = get_author(username)
+    return _keyset_feed(
+        request, 'mentions', author.username,
+        f'Упоминания @{author.username}'
+    )
+
+
+follow_fragment = login_required(feed_fragment)
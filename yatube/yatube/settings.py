@@ -54,10 +54,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.IdentityMapMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -139,14 +142,24 @@ LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+if not DEBUG:
+    # Имена с хэшем и сжатые копии готовит collectstatic.
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Адрес сайта для ссылок в письмах.
+SITE_URL = 'http://127.0.0.1:8000'
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Передача медиафайлов веб-серверу: 'X-Accel-Redirect' (nginx, с внутренним
+# location SENDFILE_URL) или 'X-Sendfile' (Apache, lighttpd).
+SENDFILE_HEADER = None
+SENDFILE_URL = '/protected-media/'
 
 CACHES = {
     'default': {
@@ -154,6 +167,19 @@ CACHES = {
     }
 }
 
+# Сессии читаются из кеша, а в базу пишутся только при изменении.
+# Без хранилища вовсе: 'django.contrib.sessions.backends.signed_cookies'
+# (данные сессии подписываются и уходят в cookie, выход не отзывает её
+# на других устройствах). Для нескольких процессов нужен общий кеш.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_SAVE_EVERY_REQUEST = False
+# Как часто воркеры удаляют истёкшие сессии из базы, в секундах.
+SESSION_PURGE_INTERVAL = 60 * 60 * 6
+
+# Переопределение лимитов частоты запросов, например:
+# {'post_create': {'user': '10/m', 'ip': '30/m'}}
+RATELIMITS = {}
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]